@@ -1,18 +1,11 @@
-from config.config import SUPABASE_DB, SUPABASE_SSL_MODE
-from sqlalchemy import create_engine
+from config import db
 from sqlalchemy.exc import OperationalError
 
 
 def get_engine():
-
-    SUPABASE_DB_URL = (
-        f"postgresql+psycopg2://{SUPABASE_DB['user']}:{SUPABASE_DB['password']}@"
-        f"{SUPABASE_DB['host']}:{SUPABASE_DB['port']}/{SUPABASE_DB['database']}?sslmode={SUPABASE_SSL_MODE}"
-    )
-
+    # The API shares the pooled engine of the load step (see config.db)
     try:
-        engine = create_engine(SUPABASE_DB_URL, pool_pre_ping=True)
-        return engine
+        return db.get_engine()
 
     except OperationalError as e:
         print(f"Database connection failed: {e}")
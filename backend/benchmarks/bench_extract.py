@@ -0,0 +1,162 @@
+"""Extraction throughput benchmark against the local mock API.
+
+Runs `extract_the_muse.main` and `extract_adzuna.main` against
+benchmarks/mock_api (which replays the recorded payloads in data/raw) and
+reports requests/s, wall time and bytes written per extractor. All output goes
+to a temporary data directory, the real data/ folder is only read.
+
+Usage (from backend/):
+    python -m benchmarks.bench_extract --repeat 3 --latency 0.05 --rate-limit 20
+    python -m benchmarks.bench_extract --error-rate 0.05 --json results.json
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import shutil
+import statistics
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def directory_size(path):
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            total += os.path.getsize(os.path.join(root, name))
+    return total
+
+
+def run_extractor(name, func, api, data_dir, quiet):
+    """Run one extractor and measure it against the mock API counters."""
+    for key in api.stats:
+        api.stats[key] = 0
+    size_before = directory_size(data_dir)
+
+    output = io.StringIO() if quiet else None
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(output) if quiet else contextlib.nullcontext():
+        func()
+    wall = time.perf_counter() - started
+
+    return {
+        "extractor": name,
+        "wall_seconds": round(wall, 3),
+        "requests": api.stats["requests"],
+        "requests_per_second": round(api.stats["requests"] / wall, 2),
+        "rate_limited": api.stats["rate_limited"],
+        "errors": api.stats["errors"],
+        "bytes_received": api.stats["bytes_sent"],
+        "bytes_written": directory_size(data_dir) - size_before,
+    }
+
+
+def print_results(results):
+    header = (
+        f"{'extractor':<10} {'run':>3} {'wall s':>8} {'requests':>9} "
+        f"{'req/s':>8} {'429':>5} {'500':>5} {'MB in':>8} {'MB written':>11}"
+    )
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        print(
+            f"{r['extractor']:<10} {r['run']:>3} {r['wall_seconds']:>8.2f} "
+            f"{r['requests']:>9} {r['requests_per_second']:>8.1f} "
+            f"{r['rate_limited']:>5} {r['errors']:>5} "
+            f"{r['bytes_received'] / 1e6:>8.2f} {r['bytes_written'] / 1e6:>11.2f}"
+        )
+
+    for name in sorted({r["extractor"] for r in results}):
+        walls = [r["wall_seconds"] for r in results if r["extractor"] == name]
+        print(f"{name}: median wall time {statistics.median(walls):.2f}s")
+
+
+def main():
+    # Config reads DATA_DIR on import, so it has to be set before any etl module
+    # is imported. Every run starts from an empty data directory.
+    data_dir = tempfile.mkdtemp(prefix="bench_extract_")
+    os.environ["DATA_DIR"] = data_dir
+    os.environ["HTTP_CACHE_MODE"] = "off"
+
+    from benchmarks import mock_api
+    from etl.extract import extract_adzuna, extract_the_muse
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument(
+        "--recorded-dir",
+        default=os.path.join(BACKEND_DIR, "data", "raw"),
+        help="raw data replayed by the mock API",
+    )
+    parser.add_argument(
+        "--muse-rate", type=float, default=None, help="client requests/s for Muse"
+    )
+    parser.add_argument(
+        "--adzuna-rate", type=float, default=20.0, help="client requests/s for Adzuna"
+    )
+    parser.add_argument(
+        "--max-companies", type=int, default=50, help="Adzuna companies per run"
+    )
+    parser.add_argument("--json", help="write the results to this file")
+    parser.add_argument("--verbose", action="store_true", help="show extractor output")
+
+    mock_api.add_arguments(parser)
+    args = parser.parse_args()
+
+    api = mock_api.api_from_args(
+        args,
+        jobs_dir=os.path.join(args.recorded_dir, "jobs"),
+        companies_dir=os.path.join(args.recorded_dir, "companies"),
+        salaries_dir=os.path.join(args.recorded_dir, "salaries"),
+    )
+    server = mock_api.start(api)
+    urls = mock_api.base_urls(server)
+
+    extract_the_muse.BASE_URL_JOBS = urls["MUSE_BASE_URL_JOBS"]
+    extract_the_muse.BASE_URL_COMPANIES = urls["MUSE_BASE_URL_COMPANIES"]
+    extract_adzuna.BASE_URL = urls["ADZUNA_BASE_URL"]
+    if args.muse_rate:
+        extract_the_muse.MAX_REQUESTS_PER_SECOND = args.muse_rate
+    extract_adzuna.MAX_REQUESTS_PER_SECOND = args.adzuna_rate
+
+    load_companies = extract_adzuna.load_companies_from_jobs
+    extract_adzuna.load_companies_from_jobs = lambda path: load_companies(path)[
+        : args.max_companies
+    ]
+
+    print(
+        f"Mock API: {len(api.jobs)} jobs, {len(api.companies)} companies, "
+        f"{sum(len(v) for v in api.salaries.values())} salaries "
+        f"(latency {args.latency}s, error rate {args.error_rate}, "
+        f"rate limit {args.rate_limit or 'off'})\n"
+    )
+
+    results = []
+    try:
+        for run in range(1, args.repeat + 1):
+            for entry in os.listdir(data_dir):
+                shutil.rmtree(os.path.join(data_dir, entry))
+            for name, func in (
+                ("muse", extract_the_muse.main),
+                ("adzuna", extract_adzuna.main),
+            ):
+                result = run_extractor(name, func, api, data_dir, not args.verbose)
+                result["run"] = run
+                results.append(result)
+    finally:
+        server.shutdown()
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+    print_results(results)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"options": vars(args), "results": results}, f, indent=2)
+        print(f"\nResults written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""Benchmark of flatten_json with an increasing number of raw snapshots.
+
+Writes N copies of a recorded snapshot from data/raw as NDJSON files into a
+temporary directory (like archives or backfills do) and times flatten_json
+serially and with process pools of different sizes.
+
+Usage (from backend/):
+    python -m benchmarks.bench_flatten --dataset jobs --files 1,8,32 --workers 1,2,4
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import shutil
+import statistics
+import tempfile
+import time
+
+from config.config import RAW_DATA_DIR
+from etl.extract.raw_sink import RawSink, list_raw_files, read_raw_records
+from etl.transform.transform import flatten_json
+
+# Columns selected by etl.transform.pipeline_transform
+DATASETS = {
+    "jobs": [
+        "id",
+        "company.id",
+        "name",
+        "levels.name",
+        "publication_date",
+        "locations",
+        "categories",
+    ],
+    "companies": [
+        "id",
+        "name",
+        "description",
+        "publication_date",
+        "size.name",
+        "locations",
+        "industries",
+    ],
+    "salaries": [
+        "id",
+        "company.display_name",
+        "title",
+        "category.label",
+        "created",
+        "location.area",
+        "salary_min",
+        "salary_max",
+        "salary_is_predicted",
+    ],
+}
+
+
+def make_files(directory, records, count):
+    """Write count NDJSON snapshots with the given records into directory."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        with RawSink(os.path.join(directory, "snapshot.ndjson.gz")) as sink:
+            sink.write_page(records)
+    for i in range(1, count):
+        shutil.copy(sink.path, os.path.join(directory, f"snapshot_{i:04d}.ndjson.gz"))
+
+
+def time_flatten(directory, cols, workers, repeat):
+    walls = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        df = flatten_json(directory, cols, cols, "benchmark", workers=workers)
+        walls.append(time.perf_counter() - started)
+    return statistics.median(walls), len(df)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--dataset", choices=sorted(DATASETS), default="jobs")
+    parser.add_argument("--files", default="1,4,16,32", help="file counts")
+    parser.add_argument("--workers", default="1,2,4", help="pool sizes (1 = serial)")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    snapshots = list_raw_files(os.path.join(RAW_DATA_DIR, args.dataset))
+    if not snapshots:
+        raise SystemExit(f"No recorded {args.dataset} snapshot in {RAW_DATA_DIR}")
+    records = read_raw_records(snapshots[-1])
+    cols = DATASETS[args.dataset]
+    file_counts = [int(n) for n in args.files.split(",")]
+    worker_counts = [int(n) for n in args.workers.split(",")]
+
+    print(
+        f"{args.dataset}: {len(records)} records per file, {os.cpu_count()} CPUs, "
+        f"median of {args.repeat} runs\n"
+    )
+    header = f"{'files':>6} {'rows':>9} " + " ".join(
+        f"{f'{w} worker(s)':>14}" for w in worker_counts
+    )
+    print(header)
+    print("-" * len(header))
+
+    for count in file_counts:
+        directory = tempfile.mkdtemp(prefix="bench_flatten_")
+        try:
+            make_files(directory, records, count)
+            cells, serial = [], None
+            for workers in worker_counts:
+                wall, rows = time_flatten(directory, cols, workers, args.repeat)
+                serial = serial or wall
+                cells.append(f"{wall:>7.3f}s x{serial / wall:>4.1f}")
+            print(f"{count:>6} {rows:>9} " + " ".join(f"{c:>14}" for c in cells))
+        finally:
+            shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
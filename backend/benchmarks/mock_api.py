@@ -0,0 +1,293 @@
+"""Local stand-in for The Muse and Adzuna APIs.
+
+Replays the recorded raw snapshots in `data/raw` (the latest Muse jobs and
+companies snapshots and the latest Adzuna snapshot) with the pagination of the
+real APIs, so the extractors can be run and benchmarked offline:
+
+    /muse/jobs?category=...&page=N[&descending=true]
+    /muse/companies?page=N
+    /adzuna/<country>/search/<page>?company=...&results_per_page=N
+
+Latency, error rate and a server side rate limit (429 with Retry-After and
+X-RateLimit-* headers) are configurable.
+
+Usage:
+    python -m benchmarks.mock_api --port 8765 --latency 0.05 --error-rate 0.01
+
+Then point the extractors at it:
+    MUSE_BASE_URL_JOBS=http://127.0.0.1:8765/muse/jobs
+    MUSE_BASE_URL_COMPANIES=http://127.0.0.1:8765/muse/companies
+    ADZUNA_BASE_URL=http://127.0.0.1:8765/adzuna
+"""
+
+import argparse
+import json
+import math
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from config.config import (
+    RAW_DATA_COMPANIES_DIR,
+    RAW_DATA_JOBS_DIR,
+    RAW_DATA_SALARIES_DIR,
+)
+from etl.extract.raw_sink import list_raw_files, read_raw_records
+
+# Page size of The Muse API
+MUSE_PAGE_SIZE = 20
+
+
+def load_latest(directory, pattern):
+    """Records of the latest raw snapshot matching pattern, or [] if there is none."""
+    files = list_raw_files(directory, pattern)
+    return read_raw_records(files[-1]) if files else []
+
+
+class ServerRateLimit:
+    """Fixed-window request budget, like the X-RateLimit-* headers of the APIs."""
+
+    def __init__(self, limit, window):
+        self.limit = limit
+        self.window = window
+        self._started = time.monotonic()
+        self._used = 0
+        self._lock = threading.Lock()
+
+    def take(self):
+        """Returns (allowed, remaining, seconds until the window resets)."""
+        with self._lock:
+            now = time.monotonic()
+            if now - self._started >= self.window:
+                self._started = now
+                self._used = 0
+            reset = self.window - (now - self._started)
+            if self._used >= self.limit:
+                return False, 0, reset
+            self._used += 1
+            return True, self.limit - self._used, reset
+
+
+class MockApi:
+    """
+    Recorded payloads plus the failure model of the mock server.
+
+    Args:
+        latency (float): Seconds added to every response.
+        jitter (float): Random extra latency, up to this many seconds.
+        error_rate (float): Share of requests answered with a 500 error.
+        rate_limit (int): Requests allowed per rate_window seconds, 0 = unlimited.
+        muse_pages (int): Upper bound for the page_count reported by The Muse.
+    """
+
+    def __init__(
+        self,
+        jobs_dir=RAW_DATA_JOBS_DIR,
+        companies_dir=RAW_DATA_COMPANIES_DIR,
+        salaries_dir=RAW_DATA_SALARIES_DIR,
+        latency=0.0,
+        jitter=0.0,
+        error_rate=0.0,
+        rate_limit=0,
+        rate_window=1.0,
+        muse_pages=200,
+        seed=None,
+    ):
+        self.jobs = load_latest(jobs_dir, "muse_jobs_all_*")
+        self.companies = load_latest(companies_dir, "muse_companies_all_*")
+        self.salaries = {}
+        for job in load_latest(salaries_dir, "adzuna_*"):
+            company = job.get("_company_query") or (job.get("company") or {}).get(
+                "display_name"
+            )
+            self.salaries.setdefault(company, []).append(job)
+
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_limit = (
+            ServerRateLimit(rate_limit, rate_window) if rate_limit else None
+        )
+        self.muse_pages = muse_pages
+        self.random = random.Random(seed)
+        self.stats = {"requests": 0, "errors": 0, "rate_limited": 0, "bytes_sent": 0}
+        self._lock = threading.Lock()
+
+    def count(self, key, value=1):
+        with self._lock:
+            self.stats[key] += value
+
+    # ---------- Endpoints ----------
+
+    def muse_jobs(self, query):
+        jobs = self.jobs
+        category = query.get("category")
+        if category:
+            jobs = [
+                job
+                for job in jobs
+                if any(c.get("name") == category for c in job.get("categories") or [])
+            ]
+        if query.get("descending") == "true":
+            jobs = sorted(
+                jobs, key=lambda job: job.get("publication_date") or "", reverse=True
+            )
+        return self._muse_page(jobs, query)
+
+    def muse_companies(self, query):
+        return self._muse_page(self.companies, query)
+
+    def _muse_page(self, records, query):
+        page = int(query.get("page", 1))
+        page_count = min(self.muse_pages, math.ceil(len(records) / MUSE_PAGE_SIZE))
+        start = (page - 1) * MUSE_PAGE_SIZE
+        results = records[start : start + MUSE_PAGE_SIZE] if page <= page_count else []
+        return {
+            "page": page,
+            "page_count": page_count,
+            "items_per_page": MUSE_PAGE_SIZE,
+            "total": len(records),
+            "results": results,
+        }
+
+    def adzuna_search(self, country, page, query):
+        jobs = [
+            job
+            for job in self.salaries.get(query.get("company"), [])
+            if job.get("_country", country) == country
+        ]
+        per_page = int(query.get("results_per_page", 10))
+        start = (page - 1) * per_page
+        return {"count": len(jobs), "results": jobs[start : start + per_page]}
+
+    def route(self, path, query):
+        """Returns the response body for a path, or None if the path is unknown."""
+        parts = [p for p in path.split("/") if p]
+        if parts == ["muse", "jobs"]:
+            return self.muse_jobs(query)
+        if parts == ["muse", "companies"]:
+            return self.muse_companies(query)
+        if len(parts) == 4 and parts[0] == "adzuna" and parts[2] == "search":
+            return self.adzuna_search(parts[1], int(parts[3]), query)
+        return None
+
+
+def make_handler(api):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            pass
+
+        def do_GET(self):
+            api.count("requests")
+            url = urlparse(self.path)
+            query = {k: v[0] for k, v in parse_qs(url.query).items()}
+
+            headers = {}
+            if api.rate_limit:
+                allowed, remaining, reset = api.rate_limit.take()
+                headers = {
+                    "X-RateLimit-Limit": str(api.rate_limit.limit),
+                    "X-RateLimit-Remaining": str(remaining),
+                    "X-RateLimit-Reset": f"{reset:.2f}",
+                }
+                if not allowed:
+                    api.count("rate_limited")
+                    headers["Retry-After"] = f"{reset:.2f}"
+                    return self.respond(429, {"error": "rate limited"}, headers)
+
+            delay = api.latency + api.random.uniform(0, api.jitter)
+            if delay:
+                time.sleep(delay)
+
+            if api.error_rate and api.random.random() < api.error_rate:
+                api.count("errors")
+                return self.respond(500, {"error": "injected error"}, headers)
+
+            body = api.route(url.path, query)
+            if body is None:
+                return self.respond(404, {"error": "not found"}, headers)
+            self.respond(200, body, headers)
+
+        def respond(self, status, body, headers):
+            data = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(data)
+            api.count("bytes_sent", len(data))
+
+    return Handler
+
+
+def start(api, host="127.0.0.1", port=0):
+    """Serve the mock API in a background thread. Returns the running server."""
+    server = ThreadingHTTPServer((host, port), make_handler(api))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def base_urls(server):
+    """Base URLs for the extractors, keyed like the config variables."""
+    host, port = server.server_address[:2]
+    root = f"http://{host}:{port}"
+    return {
+        "MUSE_BASE_URL_JOBS": f"{root}/muse/jobs",
+        "MUSE_BASE_URL_COMPANIES": f"{root}/muse/companies",
+        "ADZUNA_BASE_URL": f"{root}/adzuna",
+    }
+
+
+def add_arguments(parser):
+    """Mock server options, shared with the benchmark scripts."""
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--jitter", type=float, default=0.02)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument(
+        "--rate-limit", type=int, default=0, help="requests per window, 0 = off"
+    )
+    parser.add_argument("--rate-window", type=float, default=1.0)
+    parser.add_argument("--muse-pages", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=None)
+
+
+def api_from_args(args, **dirs):
+    return MockApi(
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        rate_limit=args.rate_limit,
+        rate_window=args.rate_window,
+        muse_pages=args.muse_pages,
+        seed=args.seed,
+        **dirs,
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    api = api_from_args(args)
+    server = start(api, args.host, args.port)
+    print(
+        f"Mock API with {len(api.jobs)} jobs, {len(api.companies)} companies and "
+        f"{sum(len(v) for v in api.salaries.values())} salaries"
+    )
+    for name, url in base_urls(server).items():
+        print(f"  {name}={url}")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -16,31 +16,102 @@ if os.getenv("RUNNING_IN_DOCKER") != "1":
     else:
         load_dotenv()
 
-# Data directories (located at backend/data/*)
-DATA_DIR = os.path.join(BACKEND_DIR, "data")
+# Data directories (located at backend/data/* unless DATA_DIR is set)
+DATA_DIR = os.environ.get("DATA_DIR", os.path.join(BACKEND_DIR, "data"))
 RAW_DATA_DIR = os.path.join(DATA_DIR, "raw")
 PROCESSED_DATA_DIR = os.path.join(DATA_DIR, "processed")
 
 RAW_DATA_JOBS_DIR = os.path.join(RAW_DATA_DIR, "jobs")
 RAW_DATA_COMPANIES_DIR = os.path.join(RAW_DATA_DIR, "companies")
 RAW_DATA_SALARIES_DIR = os.path.join(RAW_DATA_DIR, "salaries")
+RAW_DATA_DELTA_DIR = os.path.join(RAW_DATA_DIR, "delta")
+RAW_DATA_ARCHIVE_DIR = os.path.join(RAW_DATA_DIR, "archive")
+
+# Extraction state (watermarks, registries, ...) kept between runs
+STATE_DATA_DIR = os.path.join(DATA_DIR, "state")
+
+# On-disk HTTP response cache shared by the extractors.
+# Modes: "off" (always hit the API), "use" (serve fresh entries, store the rest)
+# and "replay" (serve everything from the cache, never touch the network)
+HTTP_CACHE_DIR = os.path.join(DATA_DIR, "cache", "http")
+HTTP_CACHE_MODE = os.environ.get("HTTP_CACHE_MODE", "off").lower()
+HTTP_CACHE_TTL_SECONDS = int(os.environ.get("HTTP_CACHE_TTL_SECONDS", "86400"))
+HTTP_CACHE_MAX_MB = int(os.environ.get("HTTP_CACHE_MAX_MB", "500"))
+
+# Worker processes for loading raw snapshots in the transform step (1 = serial)
+TRANSFORM_WORKERS = int(os.environ.get("TRANSFORM_WORKERS", "1"))
+
+# Only transform raw files that changed since the last run (see etl.transform.incremental)
+TRANSFORM_INCREMENTAL = (
+    os.environ.get("TRANSFORM_INCREMENTAL", "true").lower() == "true"
+)
+
+# Records per batch of the chunked transform (see etl.transform.chunked), 0 = off.
+# When set, it replaces the full and the incremental transform.
+# Bounds the memory of the transform step independent of the size of the raw data.
+TRANSFORM_BATCH_SIZE = int(os.environ.get("TRANSFORM_BATCH_SIZE", "0"))
+
+# Reprocessed archive snapshots (see etl.transform.backfill), partitioned by
+# <dataset>/date=<snapshot date>/<source>_<run id>/
+BACKFILL_DATA_DIR = os.path.join(PROCESSED_DATA_DIR, "backfill")
+BACKFILL_WORKERS = int(os.environ.get("BACKFILL_WORKERS", str(os.cpu_count() or 1)))
+
+# Per-run JSON traces of the pipeline stages (see etl.tracing)
+TRACES_DIR = os.path.join(DATA_DIR, "traces")
+TRACING_ENABLED = os.environ.get("TRACING_ENABLED", "true").lower() == "true"
 
 # Filenames produced by transform step
 JOBS_CSV_FILE = "jobs.csv"
 COMPANIES_CSV_FILE = "companies.csv"
 SALARIES_CSV_FILE = "salaries.csv"
 
+# The transform step writes Parquet (<dataset>.parquet plus one child table per
+# nested column, i.e. jobs_locations.parquet). CSV files are only written on request,
+# and only then may the loaders fall back to them (see etl.load.processed).
+PROCESSED_CSV_OUTPUT = os.environ.get("PROCESSED_CSV_OUTPUT", "false").lower() == "true"
+
 # Extraction input folder (inside the extract package)
 EXTRACT_INPUT_DIR = os.path.join(BACKEND_DIR, "etl", "extract", "input")
 
 # Adzuna API credentials (loaded from .env)
 ADZUNA_APP_ID = os.environ.get("ADZUNA_APP_ID", "")
 ADZUNA_APP_KEY = os.environ.get("ADZUNA_APP_KEY", "")
-ADZUNA_BASE_URL = "https://api.adzuna.com/v1/api/jobs"
+ADZUNA_BASE_URL = os.environ.get(
+    "ADZUNA_BASE_URL", "https://api.adzuna.com/v1/api/jobs"
+)
+
+# Adzuna markets to extract, comma separated (i.e. "us,gb,de")
+ADZUNA_COUNTRIES = [
+    c.strip().lower()
+    for c in os.environ.get("ADZUNA_COUNTRIES", "us").split(",")
+    if c.strip()
+]
+
+# Adzuna request budget shared by all extraction workers. Adzuna's default
+# quota of a developer key is 25 requests per minute (higher on request), so
+# raise it together with the quota of the key.
+ADZUNA_REQUESTS_PER_MINUTE = float(os.environ.get("ADZUNA_REQUESTS_PER_MINUTE", "25"))
+# (country, company) shards fetched concurrently under that budget
+ADZUNA_MAX_WORKERS = int(os.environ.get("ADZUNA_MAX_WORKERS", "4"))
+
+# The Muse API base URLs (overridable, i.e. to run against benchmarks/mock_api)
+MUSE_BASE_URL_JOBS = os.environ.get(
+    "MUSE_BASE_URL_JOBS", "https://www.themuse.com/api/public/jobs"
+)
+MUSE_BASE_URL_COMPANIES = os.environ.get(
+    "MUSE_BASE_URL_COMPANIES", "https://www.themuse.com/api/public/companies"
+)
 
-# The Muse API base URLs
-MUSE_BASE_URL_JOBS = "https://www.themuse.com/api/public/jobs"
-MUSE_BASE_URL_COMPANIES = "https://www.themuse.com/api/public/companies"
+# Muse request budget shared by all categories and pages. The Muse allows 500
+# requests per hour without an API key and 3600 with one, and reports the rest
+# of that hourly budget in X-RateLimit-* headers, on which the limiter pauses.
+# The default keeps the former pace of one request per 1.5 s.
+MUSE_REQUESTS_PER_SECOND = float(os.environ.get("MUSE_REQUESTS_PER_SECOND", "0.66"))
+# Pages fetched concurrently per category
+MUSE_MAX_WORKERS = int(os.environ.get("MUSE_MAX_WORKERS", "4"))
+
+# Only fetch Muse jobs published since the last run (see extract_the_muse.main)
+MUSE_INCREMENTAL = os.environ.get("MUSE_INCREMENTAL", "false").lower() == "true"
 
 # Supabase DB Config (for load step) - loaded from .env
 SUPABASE_DB = {
@@ -54,5 +125,17 @@ SUPABASE_DB = {
 SUPABASE_SCHEMA = os.environ.get("SUPABASE_SCHEMA", "raw")
 SUPABASE_SSL_MODE = os.environ.get("SUPABASE_SSL_MODE", "require")
 
+# How the raw loaders write to the database: "copy" streams the rows with
+# COPY FROM STDIN (see etl.load.bulk), "insert" uses plain to_sql INSERTs
+LOAD_METHOD = os.environ.get("LOAD_METHOD", "copy").lower()
+
+# Connection pool of the shared database engine (see config.db)
+DB_POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.environ.get("DB_MAX_OVERFLOW", "5"))
+# Seconds after which pooled connections are replaced (before Supabase drops them)
+DB_POOL_RECYCLE = int(os.environ.get("DB_POOL_RECYCLE", "1800"))
+# Server-side limit per SQL statement in milliseconds, 0 = no limit
+DB_STATEMENT_TIMEOUT_MS = int(os.environ.get("DB_STATEMENT_TIMEOUT_MS", "600000"))
+
 # ETL Token for securing API endpoints
 ETL_TOKEN = os.getenv("ETL_TOKEN")
@@ -0,0 +1,62 @@
+"""Shared SQLAlchemy engine of the Supabase database.
+
+The API and every load step use the same engine, so connections (and their
+TLS handshakes) are pooled and reused instead of opened once per module.
+"""
+
+from contextlib import contextmanager
+from functools import lru_cache
+
+from config.config import (
+    DB_MAX_OVERFLOW,
+    DB_POOL_RECYCLE,
+    DB_POOL_SIZE,
+    DB_STATEMENT_TIMEOUT_MS,
+    SUPABASE_DB,
+    SUPABASE_SSL_MODE,
+)
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Connection, Engine
+
+
+def database_url() -> str:
+    return (
+        f"postgresql+psycopg2://{SUPABASE_DB['user']}:{SUPABASE_DB['password']}@"
+        f"{SUPABASE_DB['host']}:{SUPABASE_DB['port']}/{SUPABASE_DB['database']}?sslmode={SUPABASE_SSL_MODE}"
+    )
+
+
+@lru_cache(maxsize=None)
+def get_engine() -> Engine:
+    """The engine of this process, created on first use."""
+    engine = create_engine(
+        database_url(),
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_pre_ping=True,
+        pool_recycle=DB_POOL_RECYCLE,
+    )
+
+    if DB_STATEMENT_TIMEOUT_MS > 0:
+
+        @event.listens_for(engine, "connect")
+        def set_statement_timeout(dbapi_connection, connection_record):
+            with dbapi_connection.cursor() as cur:
+                cur.execute(f"SET statement_timeout = {DB_STATEMENT_TIMEOUT_MS}")
+            dbapi_connection.commit()
+
+    return engine
+
+
+@contextmanager
+def transaction(conn: Connection = None):
+    """
+    Yield conn if given (the caller owns its transaction), otherwise a
+    connection of the shared engine in a transaction that is committed at the
+    end of the block.
+    """
+    if conn is not None:
+        yield conn
+        return
+    with get_engine().begin() as new_conn:
+        yield new_conn
@@ -0,0 +1,290 @@
+"""Content-addressed archive for raw snapshots.
+
+Archived snapshots are stored once per content as compressed blobs under
+`data/raw/archive/blobs/<hash[:2]>/<hash>.ndjson.gz`. The hash is taken over a
+canonical NDJSON form of the records (sorted keys, one record per line), so a
+snapshot that did not change between two runs is only stored once, no matter
+whether it was written as NDJSON or as a legacy JSON array.
+
+A small SQLite manifest maps every archived snapshot (dataset, run id, source,
+timestamp, record count) to its blob. Transform and backfill jobs look up
+snapshots through the indexed manifest instead of scanning directories.
+
+Usage:
+    python -m etl.extract.archive list [dataset]
+    python -m etl.extract.archive import-legacy
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import re
+import shutil
+import sqlite3
+import sys
+from datetime import datetime
+from pathlib import Path
+
+from config.config import RAW_DATA_ARCHIVE_DIR
+from etl.extract.raw_sink import (
+    RAW_SUFFIX,
+    is_raw_file,
+    iter_raw_pages,
+    list_raw_files,
+    manifest_path_for,
+)
+
+BLOBS_DIR = os.path.join(RAW_DATA_ARCHIVE_DIR, "blobs")
+MANIFEST_DB = os.path.join(RAW_DATA_ARCHIVE_DIR, "manifest.sqlite")
+
+# i.e. muse_jobs_all_20251208_172448.json -> ("muse_jobs_all", "20251208_172448")
+SNAPSHOT_NAME_PATTERN = re.compile(r"^(?P<source>.+)_(?P<run_id>\d{8}_\d{6})(\.|$)")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshots (
+    dataset      TEXT NOT NULL,
+    run_id       TEXT NOT NULL,
+    source       TEXT NOT NULL,
+    file_name    TEXT NOT NULL,
+    created_at   TEXT NOT NULL,
+    archived_at  TEXT NOT NULL,
+    record_count INTEGER NOT NULL,
+    blob_hash    TEXT NOT NULL,
+    PRIMARY KEY (dataset, source, run_id)
+);
+CREATE INDEX IF NOT EXISTS idx_snapshots_latest
+    ON snapshots (dataset, created_at DESC);
+"""
+
+
+def connect(db_path=MANIFEST_DB):
+    os.makedirs(os.path.dirname(db_path), exist_ok=True)
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def blob_path(blob_hash, blobs_dir=BLOBS_DIR):
+    return os.path.join(blobs_dir, blob_hash[:2], f"{blob_hash}{RAW_SUFFIX}")
+
+
+def parse_snapshot_name(path):
+    """Return (source, run_id, created_at) from a snapshot file name."""
+    name = os.path.basename(str(path))
+    match = SNAPSHOT_NAME_PATTERN.match(name)
+    if match:
+        run_id = match.group("run_id")
+        created_at = datetime.strptime(run_id, "%Y%m%d_%H%M%S")
+        return match.group("source"), run_id, created_at.isoformat()
+
+    created_at = datetime.fromtimestamp(os.path.getmtime(path))
+    return (
+        name.split(".")[0],
+        created_at.strftime("%Y%m%d_%H%M%S"),
+        created_at.isoformat(),
+    )
+
+
+def store_blob(path, blobs_dir=BLOBS_DIR):
+    """
+    Write the canonical, compressed form of a snapshot into the blob store.
+    Returns (blob_hash, record_count); identical content is stored only once.
+    """
+    os.makedirs(blobs_dir, exist_ok=True)
+    tmp_path = os.path.join(blobs_dir, f".{os.getpid()}_{os.path.basename(path)}.tmp")
+    digest = hashlib.sha256()
+    records = 0
+
+    with gzip.open(tmp_path, "wb") as out:
+        for page in iter_raw_pages(path):
+            lines = "".join(
+                json.dumps(r, ensure_ascii=False, sort_keys=True) + "\n" for r in page
+            ).encode("utf-8")
+            digest.update(lines)
+            out.write(lines)
+            records += len(page)
+
+    blob_hash = digest.hexdigest()
+    target = blob_path(blob_hash, blobs_dir)
+    if os.path.exists(target):
+        os.remove(tmp_path)
+    else:
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        os.replace(tmp_path, target)
+    return blob_hash, records
+
+
+def archive_snapshot(path, dataset, conn=None):
+    """
+    Move one raw snapshot into the archive: store it as a blob, record it in the
+    manifest and delete the original file (plus its sidecar manifest).
+    Returns the manifest row.
+    """
+    own_conn = conn is None
+    conn = conn or connect()
+    try:
+        source, run_id, created_at = parse_snapshot_name(path)
+        blob_hash, records = store_blob(path)
+        conn.execute(
+            """
+            INSERT OR REPLACE INTO snapshots
+                (dataset, run_id, source, file_name, created_at, archived_at,
+                 record_count, blob_hash)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (
+                dataset,
+                run_id,
+                source,
+                os.path.basename(str(path)),
+                created_at,
+                datetime.now().isoformat(timespec="seconds"),
+                records,
+                blob_hash,
+            ),
+        )
+        conn.commit()
+        row = find_snapshot(dataset, run_id, source, conn=conn)
+    finally:
+        if own_conn:
+            conn.close()
+
+    os.remove(path)
+    sidecar = manifest_path_for(str(path))
+    if os.path.exists(sidecar):
+        os.remove(sidecar)
+    return row
+
+
+def archive_old_data(directory, pattern="*"):
+    """
+    Archive all raw snapshots in a directory (dataset = directory name).
+    Returns a dict mapping original file names to their blob paths.
+    """
+    files = list_raw_files(directory, pattern)
+    if not files:
+        return {}
+
+    dataset = os.path.basename(os.path.normpath(directory))
+    archived = {}
+    conn = connect()
+    try:
+        for file_path in files:
+            row = archive_snapshot(file_path, dataset, conn=conn)
+            archived[os.path.basename(file_path)] = blob_path(row["blob_hash"])
+            print(
+                f"  📦 Archived: {os.path.basename(file_path)} "
+                f"({row['record_count']} records, blob {row['blob_hash'][:12]})"
+            )
+    finally:
+        conn.close()
+
+    # manifests of snapshots that no longer exist
+    for leftover in Path(directory).glob(pattern):
+        if leftover.is_file() and not is_raw_file(leftover):
+            if not leftover.name.startswith("."):
+                leftover.unlink()
+    return archived
+
+
+# ---------- Lookups ----------
+
+
+def find_snapshot(dataset, run_id, source=None, conn=None):
+    """Manifest row of one archived snapshot, or None."""
+    own_conn = conn is None
+    conn = conn or connect()
+    try:
+        query = "SELECT * FROM snapshots WHERE dataset = ? AND run_id = ?"
+        params = [dataset, run_id]
+        if source:
+            query += " AND source = ?"
+            params.append(source)
+        row = conn.execute(query + " LIMIT 1", params).fetchone()
+        return dict(row) if row else None
+    finally:
+        if own_conn:
+            conn.close()
+
+
+def latest_snapshot(dataset, source=None, conn=None):
+    """Manifest row of the most recent archived snapshot of a dataset, or None."""
+    own_conn = conn is None
+    conn = conn or connect()
+    try:
+        query = "SELECT * FROM snapshots WHERE dataset = ?"
+        params = [dataset]
+        if source:
+            query += " AND source = ?"
+            params.append(source)
+        row = conn.execute(
+            query + " ORDER BY created_at DESC LIMIT 1", params
+        ).fetchone()
+        return dict(row) if row else None
+    finally:
+        if own_conn:
+            conn.close()
+
+
+def list_snapshots(dataset=None, conn=None):
+    """All manifest rows, oldest first, optionally filtered by dataset."""
+    own_conn = conn is None
+    conn = conn or connect()
+    try:
+        if dataset:
+            rows = conn.execute(
+                "SELECT * FROM snapshots WHERE dataset = ? ORDER BY created_at",
+                (dataset,),
+            )
+        else:
+            rows = conn.execute("SELECT * FROM snapshots ORDER BY dataset, created_at")
+        return [dict(r) for r in rows]
+    finally:
+        if own_conn:
+            conn.close()
+
+
+def snapshot_path(row):
+    """Path of the blob that holds an archived snapshot."""
+    return blob_path(row["blob_hash"])
+
+
+# ---------- Migration of folder-based archives ----------
+
+
+def import_legacy_archives(archive_dir=RAW_DATA_ARCHIVE_DIR):
+    """
+    Move snapshots from the old `archive/<dataset>/archive_<timestamp>/` folders
+    into the blob store and delete the emptied folders.
+    """
+    imported = 0
+    conn = connect()
+    try:
+        for folder in sorted(Path(archive_dir).glob("*/archive_*")):
+            if not folder.is_dir():
+                continue
+            dataset = folder.parent.name
+            for file_path in list_raw_files(str(folder)):
+                archive_snapshot(file_path, dataset, conn=conn)
+                imported += 1
+            shutil.rmtree(folder)
+    finally:
+        conn.close()
+    print(f"Imported {imported} legacy snapshots into {BLOBS_DIR}")
+    return imported
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else "list"
+    if command == "import-legacy":
+        import_legacy_archives()
+    elif command == "list":
+        for row in list_snapshots(sys.argv[2] if len(sys.argv) > 2 else None):
+            print(
+                f"{row['dataset']:<10} {row['run_id']} {row['source']:<30} "
+                f"{row['record_count']:>7} records  {row['blob_hash'][:12]}"
+            )
+    else:
+        raise SystemExit(f"Unknown command: {command}")
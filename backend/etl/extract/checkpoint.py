@@ -0,0 +1,88 @@
+"""Checkpoints of running extractions.
+
+A checkpoint records, for one extractor run, the state of its raw sinks (part
+file, byte offset, record counts) and the last page written per stream (i.e.
+per Muse category). It is rewritten atomically after every page, together with
+the sink offset, so the part file can be truncated to the last consistent page
+when an interrupted run is resumed. A finished run removes its checkpoint.
+"""
+
+import json
+import os
+import threading
+from datetime import datetime
+
+from config.config import STATE_DATA_DIR
+
+CHECKPOINT_DIR = os.path.join(STATE_DATA_DIR, "checkpoints")
+
+
+class Checkpoint:
+    """Thread-safe, atomically written progress file of one extraction run."""
+
+    def __init__(self, name, directory=CHECKPOINT_DIR):
+        self.path = os.path.join(directory, f"{name}.json")
+        self.state = {}
+        self._lock = threading.Lock()
+
+    def load(self):
+        """
+        Load an unfinished checkpoint. Returns False if there is none or if the
+        files it refers to are gone (the checkpoint is then discarded).
+        """
+        if not os.path.exists(self.path):
+            return False
+        with open(self.path, "r", encoding="utf-8") as f:
+            state = json.load(f)
+
+        for sink in state.get("sinks", {}).values():
+            path = sink["path"] if sink.get("closed") else sink["part_path"]
+            if not os.path.exists(path):
+                print(f"⚠️ Discarding checkpoint {self.path}: {path} is missing")
+                self.clear()
+                return False
+
+        self.state = state
+        return True
+
+    def start(self, **meta):
+        """Begin a new run, replacing any previous checkpoint."""
+        with self._lock:
+            self.state = {
+                "started_at": datetime.now().isoformat(timespec="seconds"),
+                **meta,
+                "sinks": {},
+                "progress": {},
+            }
+            self._save()
+
+    def sink_state(self, name):
+        return self.state.get("sinks", {}).get(name)
+
+    def progress(self, key):
+        """Last page written for a stream and whether the stream is complete."""
+        return self.state.get("progress", {}).get(key, {"page": 0, "done": False})
+
+    def update(self, sink=None, sink_state=None, progress=None, **meta):
+        """Record a sink state and/or stream progress in one atomic write."""
+        with self._lock:
+            if sink:
+                self.state.setdefault("sinks", {})[sink] = sink_state
+            if progress:
+                self.state.setdefault("progress", {}).update(progress)
+            self.state.update(meta)
+            self._save()
+
+    def _save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.state, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+    def clear(self):
+        """Remove the checkpoint of a finished run."""
+        with self._lock:
+            self.state = {}
+            if os.path.exists(self.path):
+                os.remove(self.path)
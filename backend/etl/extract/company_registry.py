@@ -0,0 +1,125 @@
+"""Persistent registry of the companies queried on Adzuna.
+
+Adzuna extraction is split into shards, one per (country, company). For every
+shard the registry remembers when it was last fetched and keeps its salary
+postings in a compressed part file. The Adzuna extractor only queries shards
+that are new or whose part is older than the TTL, and merges the parts of all
+shards into the final snapshot.
+
+Every stored shard is also appended to a journal next to the registry, which
+acts as the per-company checkpoint: if a run is interrupted before the registry
+is saved, the next run replays the journal and does not fetch those shards
+again. Saving the registry folds the journal in and removes it.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+
+from config.config import STATE_DATA_DIR
+
+REGISTRY_PATH = os.path.join(STATE_DATA_DIR, "adzuna_company_registry.json")
+RESULTS_DIR = os.path.join(STATE_DATA_DIR, "adzuna_companies")
+
+# Cached results older than this are fetched again
+DEFAULT_TTL_SECONDS = 7 * 24 * 3600
+
+
+class CompanyRegistry:
+    """Per-shard last-fetched timestamps plus part files, keyed by country."""
+
+    def __init__(
+        self,
+        path=REGISTRY_PATH,
+        results_dir=RESULTS_DIR,
+        ttl_seconds=DEFAULT_TTL_SECONDS,
+    ):
+        self.path = path
+        self.results_dir = results_dir
+        self.ttl_seconds = ttl_seconds
+        self.journal_path = f"{path}.journal"
+        self.entries = {}
+        self.recovered = 0
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                self.entries = json.load(f)
+        if os.path.exists(self.journal_path):
+            self._replay_journal()
+
+    def _replay_journal(self):
+        """Apply the shards stored by an interrupted run."""
+        with open(self.journal_path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # last line of a run that died while writing it
+                    continue
+                self.entries.setdefault(entry["country"], {})[entry["company"]] = {
+                    "last_fetched": entry["last_fetched"],
+                    "records": entry["records"],
+                }
+                self.recovered += 1
+
+    def _results_path(self, country, company):
+        digest = hashlib.sha1(company.encode("utf-8")).hexdigest()
+        return os.path.join(self.results_dir, country, f"{digest}.json.gz")
+
+    def has_results(self, country, company):
+        return os.path.exists(self._results_path(country, company))
+
+    def is_fresh(self, country, company, now=None):
+        entry = self.entries.get(country, {}).get(company)
+        if not entry or not self.has_results(country, company):
+            return False
+        return (now or time.time()) - entry["last_fetched"] < self.ttl_seconds
+
+    def split(self, shards):
+        """Split (country, company) shards into (stale, fresh); stale ones have to be fetched."""
+        now = time.time()
+        stale, fresh = [], []
+        for country, company in shards:
+            is_fresh = self.is_fresh(country, company, now)
+            (fresh if is_fresh else stale).append((country, company))
+        return stale, fresh
+
+    def load_results(self, country, company):
+        with gzip.open(
+            self._results_path(country, company), "rt", encoding="utf-8"
+        ) as f:
+            return json.load(f)
+
+    def store_results(self, country, company, results):
+        """Write the part of a successfully fetched shard and mark it as fetched."""
+        path = self._results_path(country, company)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with gzip.open(f"{path}.tmp", "wt", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False)
+        os.replace(f"{path}.tmp", path)
+
+        entry = {"last_fetched": time.time(), "records": len(results)}
+        with self._lock:
+            self.entries.setdefault(country, {})[company] = entry
+            os.makedirs(os.path.dirname(self.journal_path), exist_ok=True)
+            with open(self.journal_path, "a", encoding="utf-8") as f:
+                f.write(
+                    json.dumps(
+                        {"country": country, "company": company, **entry},
+                        ensure_ascii=False,
+                    )
+                    + "\n"
+                )
+
+    def save(self):
+        """Write the registry atomically and drop the journal it now contains."""
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with self._lock:
+            with open(f"{self.path}.tmp", "w", encoding="utf-8") as f:
+                json.dump(self.entries, f, indent=2, ensure_ascii=False)
+            os.replace(f"{self.path}.tmp", self.path)
+            if os.path.exists(self.journal_path):
+                os.remove(self.journal_path)
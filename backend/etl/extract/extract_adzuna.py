@@ -1,19 +1,21 @@
-import json
 import os
-import shutil
-import time
-from datetime import datetime
-from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
-import pandas as pd
-import requests
 from config.config import (
     ADZUNA_APP_ID,
     ADZUNA_APP_KEY,
     ADZUNA_BASE_URL,
+    ADZUNA_COUNTRIES,
+    ADZUNA_MAX_WORKERS,
+    ADZUNA_REQUESTS_PER_MINUTE,
     RAW_DATA_JOBS_DIR,
     RAW_DATA_SALARIES_DIR,
 )
+from etl.extract.archive import archive_old_data
+from etl.extract.company_registry import CompanyRegistry
+from etl.extract.http_client import RateLimiter, create_session, get_json
+from etl.extract.raw_sink import RawSink, iter_raw_pages, list_raw_files
+from etl.tracing import span
 
 # ---------- CONFIGURATION ----------
 
@@ -24,125 +26,174 @@ BASE_URL = ADZUNA_BASE_URL
 
 # Input & Output paths (use configured directories)
 JOBS_INPUT_DIR = RAW_DATA_JOBS_DIR
-OUTPUT_PATH = os.path.join(RAW_DATA_SALARIES_DIR, "adzuna_it_jobs_by_companies.json")
+OUTPUT_PATH = os.path.join(
+    RAW_DATA_SALARIES_DIR, "adzuna_it_jobs_by_companies.ndjson.gz"
+)
+
+
+# Supported countries (ADZUNA_COUNTRIES)
+COUNTRIES = ADZUNA_COUNTRIES
+
+# Results per page (Adzuna maximum)
+RESULTS_PER_PAGE = 50
+
+# Safety cap of pages per shard, a shard cut by it is logged with its missing count
+MAX_PAGES = 200
 
-# Archive directory for old data
-ARCHIVE_BASE_DIR = os.path.join(os.path.dirname(RAW_DATA_SALARIES_DIR), "archive")
+# Requests per second shared by all workers (ADZUNA_REQUESTS_PER_MINUTE)
+MAX_REQUESTS_PER_SECOND = ADZUNA_REQUESTS_PER_MINUTE / 60
 
-# Supported countries
-COUNTRIES = ["us"]
+# Number of shards (country x company) fetched concurrently (ADZUNA_MAX_WORKERS)
+MAX_WORKERS = ADZUNA_MAX_WORKERS
 
-# Delay between API calls to avoid rate-limiting
-DELAY = 2.0
+# How often shards that failed are put back into the queue
+RETRY_ROUNDS = 2
+
+# Companies that still failed after all retry rounds
+FAILED_COMPANIES_LOG = os.path.join(
+    os.path.dirname(__file__), "logs", "adzuna_failed_companies.txt"
+)
 
 
 # ---------- FUNCTIONS ----------
 
 
 def find_latest_muse_jobs_file(directory):
-    """Find the latest muse_jobs_all_*.json file in the directory."""
+    """Find the latest muse_jobs_all_* snapshot in the directory."""
     if not os.path.exists(directory):
         raise FileNotFoundError(f"Jobs directory not found: {directory}")
 
-    files = sorted(Path(directory).glob("muse_jobs_all_*.json"), reverse=True)
+    files = list_raw_files(directory, "muse_jobs_all_*")
     if not files:
-        raise FileNotFoundError(f"No muse_jobs_all_*.json files found in {directory}")
+        raise FileNotFoundError(f"No muse_jobs_all_* files found in {directory}")
 
-    latest_file = str(files[0])
+    latest_file = files[-1]
     print(f"Found latest jobs file: {os.path.basename(latest_file)}")
     return latest_file
 
 
 def load_companies_from_jobs(jobs_file_path):
     """
-    Read company names from muse_jobs_all.json file using pandas.
+    Read company names from a muse_jobs_all snapshot in a single streaming pass.
     Extracts unique company names, removes duplicates, and returns sorted list.
     """
     if not os.path.exists(jobs_file_path):
         raise FileNotFoundError(f"Jobs file not found: {jobs_file_path}")
 
-    with open(jobs_file_path, "r", encoding="utf-8") as f:
-        jobs_data = json.load(f)
-
-    # Convert to pandas DataFrame for easier manipulation
-    df = pd.DataFrame(jobs_data)
-
-    # Extract company names from nested 'company' column
     company_names = set()
-    for company in df["company"]:
-        if isinstance(company, dict) and "name" in company:
-            name = company["name"].strip()
-            if name:
-                company_names.add(name)
-
-    companies = sorted(list(company_names))
+    for page in iter_raw_pages(jobs_file_path):
+        for job in page:
+            company = job.get("company")
+            if isinstance(company, dict) and company.get("name"):
+                name = company["name"].strip()
+                if name:
+                    company_names.add(name)
+
+    companies = sorted(company_names)
     print(f"Extracted {len(companies)} unique companies from jobs file")
     return companies
 
 
-def fetch_adzuna_page(country, company):
-    """Fetch one page of IT job results from Adzuna for a given country and company using 'it-jobs' category."""
-    url = f"{BASE_URL}/{country}/search/1"
+def fetch_adzuna_page(country, company, page=1, session=None, limiter=None):
+    """
+    Fetch one page of IT job results from Adzuna for a given country and company using 'it-jobs' category.
+    Returns the decoded response, or None if the request failed, so the shard can be retried.
+    """
+    url = f"{BASE_URL}/{country}/search/{page}"
     params = {
         "app_id": APP_ID,
         "app_key": APP_KEY,
-        "results_per_page": 50,
+        "results_per_page": RESULTS_PER_PAGE,
         "company": company,
         "category": "it-jobs",
     }
 
-    try:
-        response = requests.get(url, params=params, timeout=15)
-        if response.status_code == 200:
-            data = response.json()
-            results = data.get("results", [])
-            print(f"{country.upper()} | {company[:30]}... → {len(results)} results")
-            return results
-        else:
-            print(f"Error {response.status_code} for {country.upper()} / {company}")
-            return []
-    except Exception as e:
-        print(f"Exception for {country.upper()} / {company}: {e}")
-        return []
-
-
-def archive_old_data(directory):
-    """Move all files from directory to archive folder with timestamp."""
-    if not os.path.exists(directory):
-        return
-
-    files = list(Path(directory).glob("adzuna_*_*.json"))
-    if not files:
-        return
-
-    archive_dir = os.path.join(ARCHIVE_BASE_DIR, os.path.basename(directory))
-    os.makedirs(archive_dir, exist_ok=True)
-
-    archive_timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    archive_subfolder = os.path.join(archive_dir, f"archive_{archive_timestamp}")
-    os.makedirs(archive_subfolder, exist_ok=True)
+    return get_json(
+        session or create_session(1),
+        url,
+        params,
+        limiter,
+        label=f"{country.upper()} / {company} / page {page}:",
+    )
 
-    for file_path in files:
-        dest_path = os.path.join(archive_subfolder, file_path.name)
-        shutil.move(str(file_path), dest_path)
-        print(f"  📦 Archived: {file_path.name}")
 
-    return archive_subfolder
+def fetch_shard(country, company, session, limiter, registry):
+    """
+    Fetch all result pages of one (country, company) shard, until the count of
+    the response is covered, and write them to the shard's part file in the
+    registry. Returns the number of results, or None
+    if a page failed.
+    """
+    results = []
+    total = 0
+    page = 1
+    while True:
+        data = fetch_adzuna_page(country, company, page, session, limiter)
+        if data is None:
+            return None
+        page_results = data.get("results", [])
+        results.extend(page_results)
+        total = data.get("count") or 0
+        # all results of the shard are fetched once its count is covered
+        if not page_results or len(results) >= total:
+            break
+        if page >= MAX_PAGES:
+            print(
+                f"⚠️ {country.upper()} | {company}: stopped after {MAX_PAGES} pages, "
+                f"{total - len(results)} of {total} results not fetched"
+            )
+            break
+        page += 1
+
+    for job in results:
+        job["_country"] = country
+        job["_company_query"] = company
+    registry.store_results(country, company, results)
+    print(f"{country.upper()} | {company[:30]}... → {len(results)} results")
+    return len(results)
+
+
+def fetch_shards(shards, session, limiter, registry):
+    """
+    Fetch (country, company) shards with a bounded worker pool. Every shard
+    writes its own part, so shards of all countries run side by side.
+    Returns the list of shards that failed.
+    """
+    failed = []
 
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        futures = {
+            executor.submit(
+                fetch_shard, country, company, session, limiter, registry
+            ): (country, company)
+            for country, company in shards
+        }
+        for future in as_completed(futures):
+            if future.result() is None:
+                failed.append(futures[future])
 
-def save_json(data, output_path):
-    """Save results into a single JSON file with timestamp."""
-    os.makedirs(os.path.dirname(output_path), exist_ok=True)
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    filename = output_path.replace(".json", f"_{timestamp}.json")
+    return sorted(failed)
 
-    with open(filename, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
 
-    print(f"\nSaved {len(data)} records to {filename}")
+def merge_shards(shards, registry, output_path):
+    """
+    Merge the parts of all shards into the final salaries snapshot. Shards that
+    failed in this run contribute their previous part, if there is one.
+    """
+    with RawSink(output_path) as sink:
+        for country, company in shards:
+            if registry.has_results(country, company):
+                sink.write_page(registry.load_results(country, company))
+    return sink.path
 
 
-# ---------- MAIN ----------
+def log_failed_companies(failed):
+    """Write the companies that could not be fetched to the extract logs folder."""
+    os.makedirs(os.path.dirname(FAILED_COMPANIES_LOG), exist_ok=True)
+    with open(FAILED_COMPANIES_LOG, "w", encoding="utf-8") as f:
+        for country, company in failed:
+            f.write(f"{country.upper()} {company}\n")
+    print(f"⚠️ {len(failed)} companies failed, see {FAILED_COMPANIES_LOG}")
 
 
 def main():
@@ -150,29 +201,54 @@ def main():
         "Starting Adzuna IT job extraction (by company from Muse jobs, category=it-jobs)..."
     )
 
-    # --- ARCHIVING OLD DATA ---
-    print("\n📋 Archiving previous salary data...")
-    archive_old_data(RAW_DATA_SALARIES_DIR)
-    print("✅ Archive complete\n")
-
-    all_results = []
-
     # Find latest muse_jobs_all_*.json file
     latest_jobs_file = find_latest_muse_jobs_file(JOBS_INPUT_DIR)
 
     # Extract unique companies from jobs file
     companies = load_companies_from_jobs(latest_jobs_file)
 
-    for country in COUNTRIES:
-        for company in companies:
-            results = fetch_adzuna_page(country, company)
-            for job in results:
-                job["_country"] = country
-                job["_company_query"] = company
-            all_results.extend(results)
-            time.sleep(DELAY)
+    # One keep-alive pool and one rate budget shared by all workers
+    session = create_session(MAX_WORKERS)
+    limiter = RateLimiter(MAX_REQUESTS_PER_SECOND)
+
+    # Shards fetched within the TTL are reused from the registry
+    registry = CompanyRegistry()
+    if registry.recovered:
+        print(
+            f"⏯️ Resuming interrupted run: {registry.recovered} shards already fetched"
+        )
+    shards = [(country, company) for country in COUNTRIES for company in companies]
+    queue, cached = registry.split(shards)
+    print(
+        f"{len(shards)} shards ({len(COUNTRIES)} countries): {len(queue)} new or stale, "
+        f"{len(cached)} reused from cache"
+    )
+
+    with span("adzuna.fetch", rows_in=len(queue), cached=len(cached)):
+        try:
+            for attempt in range(RETRY_ROUNDS + 1):
+                if not queue:
+                    break
+                if attempt > 0:
+                    print(f"\n🔁 Retrying {len(queue)} failed shards...")
+                queue = fetch_shards(queue, session, limiter, registry)
+        finally:
+            registry.save()
+    failed = queue
+
+    # --- ARCHIVING OLD DATA ---
+    print("\n📋 Archiving previous salary data...")
+    with span("adzuna.archive"):
+        archive_old_data(RAW_DATA_SALARIES_DIR, "adzuna_*_*")
+    print("✅ Archive complete\n")
+
+    # --- MERGE SHARD PARTS ---
+    with span("adzuna.merge", rows_in=len(shards)):
+        merge_shards(shards, registry, OUTPUT_PATH)
+
+    if failed:
+        log_failed_companies(failed)
 
-    save_json(all_results, OUTPUT_PATH)
     print("IT company-based extraction (category=it-jobs) complete.")
 
 
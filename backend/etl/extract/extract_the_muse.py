@@ -1,137 +1,403 @@
 import json
 import os
-import shutil
-import time
-from datetime import datetime
-from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 
-import requests
 from config.config import (
     MUSE_BASE_URL_COMPANIES,
     MUSE_BASE_URL_JOBS,
+    MUSE_INCREMENTAL,
+    MUSE_MAX_WORKERS,
+    MUSE_REQUESTS_PER_SECOND,
     RAW_DATA_COMPANIES_DIR,
+    RAW_DATA_DELTA_DIR,
     RAW_DATA_JOBS_DIR,
+    STATE_DATA_DIR,
 )
+from etl.extract.archive import archive_old_data, latest_snapshot, snapshot_path
+from etl.extract.checkpoint import Checkpoint
+from etl.extract.http_client import RateLimiter, create_session, get_json
+from etl.extract.raw_sink import RawSink, iter_raw_pages, list_raw_files
+from etl.tracing import span
 
 # ---------- CONFIGURATION ----------
 
 BASE_URL_JOBS = MUSE_BASE_URL_JOBS
 BASE_URL_COMPANIES = MUSE_BASE_URL_COMPANIES
 
-OUTPUT_JOBS_PATH = os.path.join(RAW_DATA_JOBS_DIR, "muse_jobs_all.json")
-OUTPUT_COMPANIES_PATH = os.path.join(RAW_DATA_COMPANIES_DIR, "muse_companies_all.json")
+OUTPUT_JOBS_PATH = os.path.join(RAW_DATA_JOBS_DIR, "muse_jobs_all.ndjson.gz")
+OUTPUT_COMPANIES_PATH = os.path.join(
+    RAW_DATA_COMPANIES_DIR, "muse_companies_all.ndjson.gz"
+)
+
+# Incremental mode: new jobs of a run and the per-category high-water marks
+OUTPUT_JOBS_DELTA_PATH = os.path.join(
+    RAW_DATA_DELTA_DIR, "jobs", "muse_jobs_delta.ndjson.gz"
+)
+WATERMARKS_PATH = os.path.join(STATE_DATA_DIR, "muse_watermarks.json")
 
-# Archive directory for old data
-ARCHIVE_BASE_DIR = os.path.join(os.path.dirname(RAW_DATA_JOBS_DIR), "archive")
 
 CATEGORIES = ["Computer and IT", "Data and Analytics", "Software Engineering"]
 
 # Number of pages to fetch (API allows up to ~200)
 TOTAL_PAGES = 200
 
-# Delay between requests in seconds (10 min total ≈ 600 s / 400 requests ≈ 1.5 s)
-DELAY = 1.5
-
-
-# ---------- FUNCTION DEFINITIONS ----------
-
-
-def fetch_paginated_data(base_url, params=None, total_pages=200):
-    """Fetch up to total_pages pages slowly to avoid rate limits."""
-    all_results = []
-    for page in range(1, total_pages + 1):
-        params = params or {}
-        params["page"] = page
-        try:
-            response = requests.get(base_url, params=params, timeout=15)
-            if response.status_code == 200:
-                data = response.json()
-                if not data.get("results"):
-                    print(f"Page {page} returned no results. Stopping.")
-                    break
-                all_results.extend(data["results"])
-                print(
-                    f"Page {page} fetched: {len(data['results'])} items (total: {len(all_results)})"
-                )
-            else:
-                print(
-                    f"Error {response.status_code} on page {page}: {response.text[:100]}"
-                )
-                break
-        except Exception as e:
-            print(f"Exception on page {page}: {e}")
-            break
+# Requests per second shared by all categories and pages (MUSE_REQUESTS_PER_SECOND).
+# The bucket is paused on 429 responses and when X-RateLimit-Remaining reaches zero.
+MAX_REQUESTS_PER_SECOND = MUSE_REQUESTS_PER_SECOND
 
-        # Sleep to avoid rate limiting
-        time.sleep(DELAY)
+# Number of pages fetched concurrently per category (MUSE_MAX_WORKERS)
+MAX_WORKERS = MUSE_MAX_WORKERS
 
-    return all_results
 
+# ---------- FUNCTION DEFINITIONS ----------
 
-def archive_old_data(directory):
-    """Move all files from directory to archive folder with timestamp."""
-    if not os.path.exists(directory):
-        return
 
-    files = list(Path(directory).glob("muse_*_*.json"))
-    if not files:
-        return
+class PageFetchError(Exception):
+    """A page could not be fetched, even after retrying."""
+
+
+def iter_pages(
+    base_url,
+    params=None,
+    total_pages=200,
+    session=None,
+    limiter=None,
+    stop_when=None,
+    start_page=1,
+):
+    """
+    Yield (page, results) in page order, starting at start_page, while fetching
+    up to MAX_WORKERS pages ahead concurrently. Stops at the first empty page,
+    once the page_count reported by the API is reached, or after a page for
+    which stop_when(results) is true. Raises PageFetchError if a page still
+    fails after all retries, so the run can be resumed from that page.
+    """
+    session = session or create_session(MAX_WORKERS)
+    limiter = limiter or RateLimiter(MAX_REQUESTS_PER_SECOND)
+    label = f"[{params['category']}]" if params and "category" in params else ""
+
+    def fetch(page):
+        page_params = dict(params or {}, page=page)
+        return get_json(
+            session, base_url, page_params, limiter, label=f"{label} Page {page}:"
+        )
 
-    archive_dir = os.path.join(ARCHIVE_BASE_DIR, os.path.basename(directory))
-    os.makedirs(archive_dir, exist_ok=True)
+    last_page = total_pages
+    next_page = start_page
+    pending = {}
 
-    archive_timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    archive_subfolder = os.path.join(archive_dir, f"archive_{archive_timestamp}")
-    os.makedirs(archive_subfolder, exist_ok=True)
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        try:
+            for page in range(start_page, total_pages + 1):
+                if page > last_page:
+                    break
+                while next_page <= last_page and len(pending) < MAX_WORKERS:
+                    pending[next_page] = executor.submit(fetch, next_page)
+                    next_page += 1
 
-    for file_path in files:
-        dest_path = os.path.join(archive_subfolder, file_path.name)
-        shutil.move(str(file_path), dest_path)
-        print(f"  📦 Archived: {file_path.name}")
+                data = pending.pop(page).result()
+                if data is None:
+                    raise PageFetchError(f"{label} Page {page} failed".strip())
+                if not data.get("results"):
+                    print(f"{label} Page {page} returned no results. Stopping.")
+                    break
+                if data.get("page_count"):
+                    last_page = min(last_page, int(data["page_count"]))
 
-    return archive_subfolder
+                yield page, data["results"]
+                if stop_when and stop_when(data["results"]):
+                    print(f"{label} Page {page} reached the watermark. Stopping.")
+                    break
+        finally:
+            for future in pending.values():
+                future.cancel()
+
+
+def fetch_paginated_data(
+    sink,
+    base_url,
+    params=None,
+    total_pages=200,
+    session=None,
+    limiter=None,
+    stop_when=None,
+    keep=None,
+    progress_key=None,
+):
+    """
+    Fetch up to total_pages pages concurrently under a shared rate limiter and
+    stream every page into the sink as it arrives. Records for which keep(record)
+    is false are skipped. Returns the number of records written.
+
+    With a progress_key, the last written page is checkpointed with every page,
+    a stream that was already completed is skipped and an interrupted one
+    continues after its last checkpointed page.
+    """
+    total = 0
+    label = f"[{params['category']}] " if params and "category" in params else ""
+    start_page = 1
+    if progress_key and sink.checkpoint:
+        progress = sink.checkpoint.progress(progress_key)
+        if progress["done"]:
+            print(f"{label}Already complete, skipping.")
+            return total
+        start_page = progress["page"] + 1
+
+    last_page = start_page - 1
+    pages = iter_pages(
+        base_url, params, total_pages, session, limiter, stop_when, start_page
+    )
+    for page, results in pages:
+        if keep:
+            results = [record for record in results if keep(record)]
+        sink.write_page(results, _progress(progress_key, page, done=False))
+        total += len(results)
+        last_page = page
+        print(f"{label}Page {page} fetched: {len(results)} items (total: {total})")
+
+    sink.write_page([], _progress(progress_key, last_page, done=True))
+    return total
+
+
+def _progress(key, page, done):
+    if not key:
+        return None
+    return {key: {"page": page, "done": done}}
+
+
+def find_latest_snapshot(directory):
+    """
+    Path of the latest muse_jobs_all_* snapshot. Falls back to the latest
+    archived one (see archive), or None if there is none.
+    """
+    files = list_raw_files(directory, "muse_jobs_all_*")
+    if files:
+        return files[-1]
+    row = latest_snapshot(os.path.basename(directory), source="muse_jobs_all")
+    return snapshot_path(row) if row else None
+
+
+def job_category_names(job):
+    return [c.get("name") for c in job.get("categories") or [] if isinstance(c, dict)]
+
+
+def load_watermarks(previous_snapshot):
+    """
+    Load the per-category high-water marks (latest publication_date and seen job ids).
+    Falls back to the previous snapshot if no watermarks were recorded yet.
+    """
+    if os.path.exists(WATERMARKS_PATH):
+        with open(WATERMARKS_PATH, "r", encoding="utf-8") as f:
+            watermarks = json.load(f)
+    else:
+        watermarks = {}
+        if previous_snapshot:
+            for page in iter_raw_pages(previous_snapshot):
+                update_watermarks(watermarks, page)
+
+    return {
+        category: {
+            "latest_publication_date": mark.get("latest_publication_date"),
+            "seen_ids": set(mark.get("seen_ids", [])),
+        }
+        for category, mark in watermarks.items()
+    }
+
+
+def update_watermarks(watermarks, jobs):
+    """Add jobs to the watermarks of all categories they belong to."""
+    for job in jobs:
+        for category in job_category_names(job):
+            mark = watermarks.setdefault(
+                category, {"latest_publication_date": None, "seen_ids": set()}
+            )
+            mark["seen_ids"].add(job["id"])
+            published = job.get("publication_date")
+            if published and published > (mark["latest_publication_date"] or ""):
+                mark["latest_publication_date"] = published
+    return watermarks
+
+
+def save_watermarks(watermarks):
+    """Write the watermarks atomically, so an aborted run keeps the old ones."""
+    os.makedirs(os.path.dirname(WATERMARKS_PATH), exist_ok=True)
+    data = {
+        category: {
+            "latest_publication_date": mark["latest_publication_date"],
+            "seen_ids": sorted(mark["seen_ids"]),
+        }
+        for category, mark in watermarks.items()
+    }
+    tmp_path = f"{WATERMARKS_PATH}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp_path, WATERMARKS_PATH)
+
+
+def fetch_new_jobs(sink, category, watermark, session, limiter, progress_key=None):
+    """
+    Fetch the jobs of a category newest first and stop paginating at the first
+    page that only contains already seen postings. Only unseen jobs are written
+    to the sink. Returns the number of new jobs.
+    """
+    seen_ids = watermark["seen_ids"] if watermark else set()
+    latest = (watermark or {}).get("latest_publication_date") or ""
+
+    def is_seen(job):
+        return job["id"] in seen_ids or (job.get("publication_date") or "") < latest
+
+    return fetch_paginated_data(
+        sink,
+        BASE_URL_JOBS,
+        params={"category": category, "descending": "true"},
+        total_pages=TOTAL_PAGES,
+        session=session,
+        limiter=limiter,
+        stop_when=lambda results: all(is_seen(job) for job in results),
+        keep=lambda job: job["id"] not in seen_ids,
+        progress_key=progress_key,
+    )
+
+
+def merge_snapshot(sink, delta_path, previous_snapshot, watermarks):
+    """
+    Stream the delta and all postings of the previous snapshot that were not
+    fetched again into the full snapshot, updating the watermarks on the way.
+    """
+    new_ids = set()
+    for page in iter_raw_pages(delta_path):
+        sink.write_page(page)
+        update_watermarks(watermarks, page)
+        new_ids.update(job["id"] for job in page)
+
+    if previous_snapshot:
+        for page in iter_raw_pages(previous_snapshot):
+            page = [job for job in page if job["id"] not in new_ids]
+            sink.write_page(page)
+            update_watermarks(watermarks, page)
 
 
-def save_json(data, output_path):
-    """Save combined JSON data to a file."""
-    os.makedirs(os.path.dirname(output_path), exist_ok=True)
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    filename = output_path.replace(".json", f"_{timestamp}.json")
-    with open(filename, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
-    print(f"\n💾 Saved {len(data)} records to {filename}")
+# ---------- MAIN EXTRACTION LOGIC ----------
 
 
-# ---------- MAIN EXTRACTION LOGIC ----------
+def main(incremental=MUSE_INCREMENTAL, resume=True):
+    """
+    Extract jobs and companies from The Muse.
 
+    Pages are streamed into compressed NDJSON snapshots while they arrive (see
+    raw_sink). In incremental mode, jobs are fetched newest first per category
+    until a page only contains postings seen in a previous run. The new postings
+    are written to a delta file and merged with the previous snapshot into the
+    full snapshot. Postings that were removed from The Muse stay in the snapshot
+    until the next full (non-incremental) run.
 
-def main():
+    Progress is checkpointed after every page. If a previous run was
+    interrupted (crash or a page that kept failing), it is resumed in its own
+    mode from the last written page of every category, unless resume is False.
+    The previous snapshots are only archived once all pages have been fetched.
+    """
     print("\n🚀 Starting extraction from The Muse API...\n")
 
-    # --- ARCHIVING OLD DATA ---
-    print("📋 Archiving previous raw data...")
-    archive_old_data(RAW_DATA_JOBS_DIR)
-    archive_old_data(RAW_DATA_COMPANIES_DIR)
-    print("✅ Archive complete\n")
-
-    # --- JOBS ---
-    all_jobs = []
-    for category in CATEGORIES:
-        print(f"\n📂 Fetching jobs for category: {category}")
-        params = {"category": category}
-        jobs = fetch_paginated_data(
-            BASE_URL_JOBS, params=params, total_pages=TOTAL_PAGES
+    checkpoint = Checkpoint("muse")
+    if resume and checkpoint.load():
+        incremental = checkpoint.state["incremental"]
+        previous_snapshot = checkpoint.state["previous_snapshot"]
+        print(f"⏯️ Resuming run started at {checkpoint.state['started_at']}")
+    else:
+        previous_snapshot = None
+        if incremental:
+            previous_snapshot = find_latest_snapshot(RAW_DATA_JOBS_DIR)
+        checkpoint.start(incremental=incremental, previous_snapshot=previous_snapshot)
+
+    # --- WATERMARKS (read before the previous snapshot gets archived) ---
+    if incremental:
+        watermarks = load_watermarks(previous_snapshot)
+        print(f"🔖 Incremental mode, previous snapshot: {previous_snapshot}")
+
+    # One connection pool and one rate budget for all categories and pages
+    session = create_session(MAX_WORKERS * (len(CATEGORIES) + 1))
+    limiter = RateLimiter(MAX_REQUESTS_PER_SECOND)
+
+    jobs_sink = RawSink(
+        OUTPUT_JOBS_DELTA_PATH if incremental else OUTPUT_JOBS_PATH,
+        checkpoint,
+        name="jobs",
+    )
+    companies_sink = RawSink(OUTPUT_COMPANIES_PATH, checkpoint, name="companies")
+
+    with jobs_sink, companies_sink, ThreadPoolExecutor(
+        max_workers=len(CATEGORIES) + 1
+    ) as executor, span("muse.fetch") as fetch_span:
+        print("\n📂 Fetching jobs for categories: " + ", ".join(CATEGORIES))
+        print("🏢 Fetching companies (no filters)...")
+        if incremental:
+            job_futures = {
+                category: executor.submit(
+                    fetch_new_jobs,
+                    jobs_sink,
+                    category,
+                    watermarks.get(category),
+                    session,
+                    limiter,
+                    f"jobs:{category}",
+                )
+                for category in CATEGORIES
+            }
+        else:
+            job_futures = {
+                category: executor.submit(
+                    fetch_paginated_data,
+                    jobs_sink,
+                    BASE_URL_JOBS,
+                    {"category": category},
+                    TOTAL_PAGES,
+                    session,
+                    limiter,
+                    progress_key=f"jobs:{category}",
+                )
+                for category in CATEGORIES
+            }
+        companies_future = executor.submit(
+            fetch_paginated_data,
+            companies_sink,
+            BASE_URL_COMPANIES,
+            None,
+            TOTAL_PAGES,
+            session,
+            limiter,
+            progress_key="companies",
         )
-        all_jobs.extend(jobs)
-        print(f"✅ Category '{category}' completed: {len(jobs)} jobs\n")
 
-    save_json(all_jobs, OUTPUT_JOBS_PATH)
+        # --- JOBS ---
+        for category, future in job_futures.items():
+            print(f"✅ Category '{category}' completed: {future.result()} jobs")
+
+        # --- COMPANIES ---
+        companies_future.result()
+        fetch_span.rows_out = jobs_sink.records + companies_sink.records
+
+        # --- ARCHIVING OLD DATA (only once the new snapshots are complete) ---
+        if not checkpoint.state.get("archived"):
+            print("📋 Archiving previous raw data...")
+            with span("muse.archive"):
+                archived_jobs = archive_old_data(RAW_DATA_JOBS_DIR, "muse_*_*")
+                archive_old_data(RAW_DATA_COMPANIES_DIR, "muse_*_*")
+            print("✅ Archive complete\n")
+
+            if previous_snapshot:
+                previous_snapshot = archived_jobs.get(
+                    os.path.basename(previous_snapshot), previous_snapshot
+                )
+            checkpoint.update(archived=True, previous_snapshot=previous_snapshot)
 
-    # --- COMPANIES ---
-    print("\n🏢 Fetching companies (no filters)...")
-    all_companies = fetch_paginated_data(BASE_URL_COMPANIES, total_pages=TOTAL_PAGES)
-    save_json(all_companies, OUTPUT_COMPANIES_PATH)
+    # --- FULL SNAPSHOT (incremental mode) ---
+    if incremental:
+        with span("muse.merge") as merge_span, RawSink(OUTPUT_JOBS_PATH) as full_sink:
+            merge_snapshot(full_sink, jobs_sink.path, previous_snapshot, watermarks)
+            merge_span.rows_out = full_sink.records
+        save_watermarks(watermarks)
 
+    checkpoint.clear()
     print("\n🎉 Extraction complete!")
 
 
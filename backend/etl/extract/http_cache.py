@@ -0,0 +1,167 @@
+"""On-disk cache for API responses, shared by the extract scripts.
+
+Entries are keyed on the URL plus the normalized query parameters (sorted,
+stringified, credentials removed) and stored as gzipped JSON files. Fresh
+entries are served instead of calling the API; the cache is kept below a size
+limit by evicting the least recently used entries.
+
+In "replay" mode every request is answered from the cache regardless of its
+age and nothing is sent over the network, so a whole extraction run can be
+reproduced offline (e.g. on build machines without API credentials).
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from urllib.parse import urlencode
+
+from config.config import (
+    HTTP_CACHE_DIR,
+    HTTP_CACHE_MAX_MB,
+    HTTP_CACHE_MODE,
+    HTTP_CACHE_TTL_SECONDS,
+)
+
+CACHE_MODES = {"off", "use", "replay"}
+
+# Query parameters that never become part of a cache key
+IGNORED_PARAMS = {"app_id", "app_key", "api_key"}
+
+
+def normalize_params(params):
+    """Sort parameters, drop credentials and empty values, stringify the rest."""
+    return sorted(
+        (str(k), str(v))
+        for k, v in (params or {}).items()
+        if k not in IGNORED_PARAMS and v is not None
+    )
+
+
+def cache_key(url, params=None):
+    raw = f"{url}?{urlencode(normalize_params(params))}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """
+    Thread-safe on-disk response cache with TTL and size-bounded LRU eviction.
+    """
+
+    def __init__(
+        self,
+        directory=HTTP_CACHE_DIR,
+        mode=HTTP_CACHE_MODE,
+        ttl_seconds=HTTP_CACHE_TTL_SECONDS,
+        max_bytes=HTTP_CACHE_MAX_MB * 1024 * 1024,
+    ):
+        if mode not in CACHE_MODES:
+            raise ValueError(f"Unknown HTTP cache mode: {mode}")
+        self.directory = directory
+        self.mode = mode
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._size = None
+
+    @property
+    def enabled(self):
+        return self.mode != "off"
+
+    @property
+    def replay(self):
+        return self.mode == "replay"
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], f"{key}.json.gz")
+
+    def get(self, url, params=None):
+        """Return the cached body, or None if there is no (fresh) entry."""
+        if not self.enabled:
+            return None
+        path = self._path(cache_key(url, params))
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if not self.replay and time.time() - entry["stored_at"] > self.ttl_seconds:
+            return None
+
+        # mark as recently used for the LRU eviction
+        os.utime(path)
+        return entry["body"]
+
+    def set(self, url, params, body):
+        """Store a response body and evict old entries if the cache is too large."""
+        if not self.enabled:
+            return
+        path = self._path(cache_key(url, params))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        entry = {
+            "url": url,
+            "params": normalize_params(params),
+            "stored_at": time.time(),
+            "body": body,
+        }
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+            json.dump(entry, f, ensure_ascii=False)
+        size = os.path.getsize(tmp_path)
+        old_size = os.path.getsize(path) if os.path.exists(path) else 0
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            if self._size is None:
+                self._size = self._scan_size()
+            else:
+                self._size += size - old_size
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def _entries(self):
+        return list(Path(self.directory).glob("*/*.json.gz"))
+
+    def _scan_size(self):
+        return sum(p.stat().st_size for p in self._entries())
+
+    def _evict(self):
+        """Delete least recently used entries until the cache is below 90% of its limit."""
+        entries = []
+        for p in self._entries():
+            try:
+                stat = p.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, p))
+
+        target = self.max_bytes * 0.9
+        for _, size, p in sorted(entries, key=lambda e: e[0]):
+            if self._size <= target:
+                break
+            try:
+                p.unlink()
+            except FileNotFoundError:
+                pass
+            self._size -= size
+
+
+_default_cache = None
+
+
+def default_cache():
+    """Cache configured from the environment, shared by all extractors."""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = ResponseCache()
+    return _default_cache
+
+
+def set_default_cache(cache):
+    """Replace the shared cache (e.g. to switch to replay mode for a run)."""
+    global _default_cache
+    _default_cache = cache
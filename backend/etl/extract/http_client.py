@@ -0,0 +1,174 @@
+"""Shared HTTP helpers for the extract scripts.
+
+Provides a thread-safe token-bucket rate limiter, a pooled `requests` session
+and `get_json`, which fetches one JSON document while honouring the API's
+rate-limit feedback (429, Retry-After and X-RateLimit-* headers). Responses go
+through the shared on-disk cache (see http_cache) when it is enabled.
+"""
+
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+import requests
+from etl.extract.http_cache import ResponseCache, default_cache
+from requests.adapters import HTTPAdapter
+
+# Status codes that are worth retrying (rate limit, timeouts, server errors)
+RETRY_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+
+
+class RateLimiter:
+    """
+    Token bucket shared by all workers of an extractor.
+
+    Tokens are refilled at `rate` per second up to `capacity`; every request
+    takes one token. When the API signals that the budget is exhausted, the
+    whole bucket is paused so that all workers back off together.
+    """
+
+    def __init__(self, rate: float, capacity: float = None):
+        self.rate = float(rate)
+        self.capacity = float(capacity or max(1.0, self.rate))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a request may be sent."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                elapsed = max(0.0, now - self._updated)
+                self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+                self._updated = max(self._updated, now)
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = max(self._updated - now, 0.0) + (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+    def pause(self, seconds: float):
+        """Stop handing out tokens for the given number of seconds."""
+        if seconds <= 0:
+            return
+        with self._lock:
+            resume_at = time.monotonic() + seconds
+            if resume_at > self._updated:
+                self._updated = resume_at
+                self._tokens = 0.0
+
+    def update_from_headers(self, headers):
+        """Pause until the rate-limit window resets once the budget is used up."""
+        remaining = _header_number(headers, "X-RateLimit-Remaining")
+        reset = _header_number(headers, "X-RateLimit-Reset")
+        if remaining is not None and remaining <= 0 and reset:
+            self.pause(reset)
+
+
+def _header_number(headers, name):
+    try:
+        return float(headers.get(name))
+    except (TypeError, ValueError):
+        return None
+
+
+def retry_after_seconds(headers):
+    """Parse a Retry-After header (delta seconds or HTTP date)."""
+    value = headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+def create_session(pool_size: int = 10) -> requests.Session:
+    """Create a session whose keep-alive pool is large enough for all workers."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def get_json(
+    session: requests.Session,
+    url: str,
+    params: dict = None,
+    limiter: RateLimiter = None,
+    max_retries: int = 5,
+    backoff: float = 1.0,
+    timeout: int = 15,
+    label: str = "",
+    cache: ResponseCache = None,
+):
+    """
+    Fetch a JSON document, retrying rate-limited and failed requests.
+
+    Rate-limited (429) and server error responses pause the shared limiter with
+    an exponential backoff (or for Retry-After seconds, if given), so all workers
+    back off together. Connection problems and 200 responses with a body that
+    is not JSON are retried with a local backoff.
+    Other client errors are not retried.
+
+    Cached responses are returned without taking a rate-limit token. In replay
+    mode a cache miss counts as a failed request.
+
+    Returns:
+        dict | list | None: Decoded JSON body, or None if the request failed.
+    """
+    cache = cache or default_cache()
+    if cache.enabled:
+        data = cache.get(url, params)
+        if data is not None:
+            return data
+        if cache.replay:
+            print(f"{label} Not in cache (replay mode)".strip())
+            return None
+
+    error = None
+    for attempt in range(max_retries + 1):
+        if limiter:
+            limiter.acquire()
+        delay = backoff * 2**attempt + random.uniform(0, backoff)
+        try:
+            response = session.get(url, params=params, timeout=timeout)
+        except requests.RequestException as e:
+            error = f"Exception: {e}"
+        else:
+            if limiter:
+                limiter.update_from_headers(response.headers)
+            if response.status_code == 200:
+                try:
+                    data = response.json()
+                except ValueError as e:
+                    # HTML error page of a proxy or a truncated body, retried
+                    error = f"Invalid JSON: {e}"
+                else:
+                    cache.set(url, params, data)
+                    return data
+            else:
+                error = f"Error {response.status_code}: {response.text[:100]}"
+                if response.status_code not in RETRY_STATUS_CODES:
+                    break
+                if response.status_code == 429:
+                    wait = retry_after_seconds(response.headers)
+                    delay = wait if wait is not None else delay
+                if limiter and attempt < max_retries:
+                    # back off globally, so the other workers slow down as well
+                    limiter.pause(delay)
+                    continue
+        if attempt < max_retries:
+            time.sleep(delay)
+
+    print(f"{label} {error}".strip())
+    return None
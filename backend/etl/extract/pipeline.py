@@ -9,6 +9,8 @@ to `sys.path` automatically.
 """
 import logging
 
+from etl.tracing import span, trace_run
+
 from . import extract_adzuna, extract_the_muse
 
 
@@ -18,20 +20,27 @@ def run_all():
     Order:
       1. The Muse (jobs + companies)
       2. Adzuna (company-based search, reads from Muse jobs output)
+
+    Both extractors resume an interrupted previous run from its checkpoints
+    (Muse: per page and category, Adzuna: per company) instead of starting over.
+    Both steps are traced (see etl.tracing).
     """
     logging.info("Starting full extract pipeline...")
 
-    try:
-        logging.info("Running The Muse extractor...")
-        extract_the_muse.main()
-    except Exception as exc:  # keep going even if one step fails
-        logging.exception("The Muse extractor failed: %s", exc)
-
-    try:
-        logging.info("Running Adzuna extractor...")
-        extract_adzuna.main()
-    except Exception as exc:
-        logging.exception("Adzuna extractor failed: %s", exc)
+    with trace_run("extract"):
+        try:
+            logging.info("Running The Muse extractor...")
+            with span("extract.muse"):
+                extract_the_muse.main()
+        except Exception as exc:  # keep going even if one step fails
+            logging.exception("The Muse extractor failed: %s", exc)
+
+        try:
+            logging.info("Running Adzuna extractor...")
+            with span("extract.adzuna"):
+                extract_adzuna.main()
+        except Exception as exc:
+            logging.exception("Adzuna extractor failed: %s", exc)
 
     logging.info("Extract pipeline finished.")
 
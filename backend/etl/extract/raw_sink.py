@@ -0,0 +1,213 @@
+"""Streaming writer and readers for raw extraction snapshots.
+
+Raw snapshots are gzip-compressed NDJSON files (one JSON record per line).
+Every page is compressed as its own gzip member and appended to a hidden part
+file while the extraction is still running, so a run never holds all records
+in memory. `RawSink.close` renames the part file atomically to its final name
+and writes a small manifest with the record counts next to it.
+
+With a checkpoint (see checkpoint), the sink records its byte offset after
+every page, keeps the part file when the run fails and continues it when the
+run is resumed.
+
+The readers understand both this format and the older indented JSON arrays.
+"""
+
+import gzip
+import json
+import os
+import threading
+from datetime import datetime
+from itertools import islice
+from pathlib import Path
+
+RAW_SUFFIX = ".ndjson.gz"
+LEGACY_SUFFIX = ".json"
+MANIFEST_SUFFIX = ".manifest.json"
+
+
+class RawSink:
+    """
+    Append-only, thread-safe writer for one raw snapshot.
+
+    Args:
+        output_path (str): Base path of the snapshot, i.e. ".../muse_jobs_all.ndjson.gz".
+            A timestamp is added to the file name, like the JSON files before.
+    """
+
+    def __init__(self, output_path: str, checkpoint=None, name: str = None):
+        self.checkpoint = checkpoint
+        self.name = name or os.path.basename(output_path)
+        self._lock = threading.Lock()
+
+        state = checkpoint.sink_state(self.name) if checkpoint else None
+        if state:
+            self._resume(state)
+            return
+
+        directory = os.path.dirname(output_path)
+        os.makedirs(directory, exist_ok=True)
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        base_name = os.path.basename(output_path)
+        if base_name.endswith(RAW_SUFFIX):
+            base_name = base_name[: -len(RAW_SUFFIX)]
+        elif base_name.endswith(LEGACY_SUFFIX):
+            base_name = base_name[: -len(LEGACY_SUFFIX)]
+
+        self.path = os.path.join(directory, f"{base_name}_{timestamp}{RAW_SUFFIX}")
+        self.part_path = os.path.join(directory, f".{os.path.basename(self.path)}.part")
+        self.records = 0
+        self.pages = 0
+        self.bytes_written = 0
+        self.closed = False
+        self._file = open(self.part_path, "wb")
+        if checkpoint:
+            checkpoint.update(self.name, self._state())
+
+    def _resume(self, state):
+        """Continue the part file of an interrupted run after its last checkpointed page."""
+        self.path = state["path"]
+        self.part_path = state["part_path"]
+        self.records = state["records"]
+        self.pages = state["pages"]
+        self.bytes_written = state["offset"]
+        self.closed = state.get("closed", False)
+        self._file = None
+        if not self.closed:
+            self._file = open(self.part_path, "r+b")
+            # drop a page that was written after the last checkpoint
+            self._file.truncate(self.bytes_written)
+            self._file.seek(self.bytes_written)
+            print(f"⏯️ Resuming {self.path} after {self.records} records")
+
+    def _state(self):
+        return {
+            "path": self.path,
+            "part_path": self.part_path,
+            "offset": self.bytes_written,
+            "records": self.records,
+            "pages": self.pages,
+            "closed": self.closed,
+        }
+
+    def write_page(self, records, progress: dict = None):
+        """
+        Compress one page of records and append it to the part file. The
+        progress (i.e. {"jobs:Data and Analytics": {"page": 3, "done": False}})
+        is checkpointed together with the new offset.
+        """
+        if records:
+            payload = "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in records)
+            data = gzip.compress(payload.encode("utf-8"))
+        with self._lock:
+            if records:
+                self._file.write(data)
+                self._file.flush()
+                self.records += len(records)
+                self.pages += 1
+                self.bytes_written += len(data)
+            if self.checkpoint and (records or progress):
+                self.checkpoint.update(self.name, self._state(), progress)
+
+    def close(self):
+        """Finalize the snapshot atomically and write its manifest."""
+        with self._lock:
+            if self.closed:
+                return self.path
+            os.fsync(self._file.fileno())
+            self._file.close()
+            os.replace(self.part_path, self.path)
+            self.closed = True
+
+        manifest = {
+            "file": os.path.basename(self.path),
+            "format": "ndjson.gz",
+            "records": self.records,
+            "pages": self.pages,
+            "bytes": self.bytes_written,
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+        }
+        manifest_path = manifest_path_for(self.path)
+        tmp_path = f"{manifest_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp_path, manifest_path)
+
+        if self.checkpoint:
+            self.checkpoint.update(self.name, self._state())
+
+        print(f"\n💾 Saved {self.records} records to {self.path}")
+        return self.path
+
+    def abort(self):
+        """
+        Discard the part file of a failed run. With a checkpoint, the part file
+        is kept so that the next run can resume it.
+        """
+        with self._lock:
+            if self.closed:
+                return
+            self._file.close()
+            if self.checkpoint:
+                print(f"⏸️ Kept {self.records} records of {self.path} for resuming")
+            elif os.path.exists(self.part_path):
+                os.remove(self.part_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+        return False
+
+
+def manifest_path_for(path: str) -> str:
+    for suffix in (RAW_SUFFIX, LEGACY_SUFFIX):
+        if path.endswith(suffix):
+            return path[: -len(suffix)] + MANIFEST_SUFFIX
+    return path + MANIFEST_SUFFIX
+
+
+def is_raw_file(path) -> bool:
+    """True for finished raw snapshots (no manifests, part or hidden files)."""
+    name = os.path.basename(str(path))
+    if name.startswith(".") or name.endswith(MANIFEST_SUFFIX):
+        return False
+    return name.endswith(RAW_SUFFIX) or name.endswith(LEGACY_SUFFIX)
+
+
+def list_raw_files(directory: str, pattern: str = "*") -> list:
+    """Sorted list of raw snapshot files in a directory."""
+    if not os.path.exists(directory):
+        return []
+    return sorted(
+        str(p) for p in Path(directory).glob(pattern) if p.is_file() and is_raw_file(p)
+    )
+
+
+def iter_raw_pages(path: str, page_size: int = 1000):
+    """
+    Yield the records of a raw snapshot in lists of at most page_size records.
+    NDJSON files are streamed line by line; legacy JSON arrays are loaded at once.
+    """
+    if str(path).endswith(RAW_SUFFIX):
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            lines = (line for line in f if line.strip())
+            while True:
+                page = [json.loads(line) for line in islice(lines, page_size)]
+                if not page:
+                    return
+                yield page
+    else:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        for start in range(0, len(data), page_size):
+            yield data[start : start + page_size]
+
+
+def read_raw_records(path: str) -> list:
+    """Read all records of a raw snapshot into a list."""
+    return [record for page in iter_raw_pages(path) for record in page]
@@ -0,0 +1,83 @@
+"""Bulk loading of DataFrames into the raw tables.
+
+`DataFrame.to_sql` inserts rows with executemany, one INSERT per row on the
+wire. With LOAD_METHOD=copy the rows are streamed with PostgreSQL
+`COPY ... FROM STDIN` instead: pandas hands the rows of every chunk to
+`copy_from_stdin`, which writes them into an in-memory CSV buffer and sends it
+with a single COPY statement.
+"""
+
+import csv
+import io
+
+import pandas as pd
+from config.config import LOAD_METHOD, SUPABASE_SCHEMA
+
+# Rows per COPY statement, bounds the size of the in-memory CSV buffer
+COPY_CHUNK_ROWS = 50_000
+
+# NULL marker of the CSV rows. Empty strings stay empty strings (as with INSERTs),
+# only None is loaded as NULL.
+NULL = r"\N"
+
+
+def _quote(identifier: str) -> str:
+    return '"' + identifier.replace('"', '""') + '"'
+
+
+def copy_from_stdin(table, conn, keys, data_iter):
+    """
+    `method` callable of DataFrame.to_sql that loads a chunk of rows with
+    COPY FROM STDIN (psycopg2).
+    Args:
+        table (pandas.io.sql.SQLTable): Target table.
+        conn (sqlalchemy.engine.Connection): Connection of to_sql.
+        keys (list[str]): Column names.
+        data_iter (Iterable[tuple]): Rows, with None for missing values.
+    Returns:
+        int: Number of rows copied.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in data_iter:
+        writer.writerow([NULL if value is None else value for value in row])
+    buffer.seek(0)
+
+    name = _quote(table.name)
+    if table.schema:
+        name = f"{_quote(table.schema)}.{name}"
+    columns = ", ".join(_quote(k) for k in keys)
+    sql = f"COPY {name} ({columns}) FROM STDIN WITH (FORMAT csv, NULL '{NULL}')"
+
+    with conn.connection.cursor() as cur:
+        cur.copy_expert(sql, buffer)
+        return cur.rowcount
+
+
+def write_raw(
+    df: pd.DataFrame,
+    name: str,
+    con,
+    schema: str = SUPABASE_SCHEMA,
+    method: str = LOAD_METHOD,
+) -> None:
+    """
+    Append df to the table schema.name.
+    Args:
+        con: SQLAlchemy engine or connection.
+        method (str): "copy" (COPY FROM STDIN) or "insert" (plain to_sql INSERTs).
+    """
+    if method == "copy":
+        df.to_sql(
+            name,
+            con,
+            schema=schema,
+            if_exists="append",
+            index=False,
+            method=copy_from_stdin,
+            chunksize=COPY_CHUNK_ROWS,
+        )
+    elif method == "insert":
+        df.to_sql(name, con, schema=schema, if_exists="append", index=False)
+    else:
+        raise ValueError(f"Unknown load method {method!r}, use 'copy' or 'insert'")
@@ -1,97 +1,60 @@
-import ast
-from itertools import product
-
 import pandas as pd
 from config.config import (
     COMPANIES_CSV_FILE,
+    LOAD_METHOD,
     PROCESSED_DATA_DIR,
-    SUPABASE_DB,
     SUPABASE_SCHEMA,
-    SUPABASE_SSL_MODE,
 )
-from sqlalchemy import create_engine
-
-
-def load_companies():
-    csv_path = f"{PROCESSED_DATA_DIR}/{COMPANIES_CSV_FILE}"
-
-    engine = create_engine(
-        f"postgresql+psycopg2://{SUPABASE_DB['user']}:{SUPABASE_DB['password']}@"
-        f"{SUPABASE_DB['host']}:{SUPABASE_DB['port']}/{SUPABASE_DB['database']}?sslmode={SUPABASE_SSL_MODE}"
-    )
-
+from config.db import transaction
+from etl.load.bulk import write_raw
+from etl.load.processed import (
+    check_csv_fallback,
+    expand_nested,
+    has_parquet,
+    read_backfill,
+    read_expanded,
+)
+from etl.tracing import span
+
+# Columns of raw.companies, one row per location x industry of a record
+RAW_COLUMNS = [
+    "company_id",
+    "company_name",
+    "description",
+    "publication_date",
+    "size",
+    "location_city",
+    "location_state",
+    "location_country",
+    "industry_name",
+]
+
+
+def expand_csv(csv_path):
+    """Parse the nested columns of the CSV file and expand them into rows."""
     df = pd.read_csv(csv_path)
+    return expand_nested(df, ["locations", "industries"]).reindex(columns=RAW_COLUMNS)
 
-    # Hilfsfunktion: parse JSON-ähnliche Listen
-    def parse_list(value):
-        if pd.isna(value) or str(value).strip() == "":
-            return []
-        try:
-            return ast.literal_eval(value)
-        except Exception:
-            return []
-
-    records = []
 
-    for _, row in df.iterrows():
-        # --- Locations extrahieren ---
-        loc_entries = parse_list(row.get("locations", "[]"))
-        if not loc_entries:
-            loc_entries = [None]
-
-        parsed_locations = []
-        for loc in loc_entries:
-            if isinstance(loc, dict):
-                parsed_locations.append(
-                    {
-                        "location_city": loc.get("city"),
-                        "location_state": loc.get("subdivision_code")
-                        or loc.get("state"),
-                        "location_country": loc.get("country_code")
-                        or loc.get("country"),
-                    }
-                )
-            else:
-                parsed_locations.append(
-                    {
-                        "location_city": None,
-                        "location_state": None,
-                        "location_country": None,
-                    }
-                )
-
-        # --- Industries extrahieren ---
-        industry_entries = parse_list(row.get("industries", "[]"))
-        if not industry_entries:
-            industry_entries = [None]
-
-        parsed_industries = []
-        for ind in industry_entries:
-            if isinstance(ind, dict):
-                parsed_industries.append({"industry_name": ind.get("name")})
-            else:
-                parsed_industries.append({"industry_name": None})
+def load_companies(backfill=False, conn=None):
+    csv_path = f"{PROCESSED_DATA_DIR}/{COMPANIES_CSV_FILE}"
 
-        # --- Eine Zeile pro Kombination (Location × Industry) ---
-        for loc, ind in product(parsed_locations, parsed_industries):
-            records.append(
-                {
-                    "company_id": row.get("company_id"),
-                    "company_name": row.get("company_name"),
-                    "description": row.get("description"),
-                    "publication_date": row.get("publication_date"),
-                    "size": row.get("size"),
-                    "location_city": loc["location_city"],
-                    "location_state": loc["location_state"],
-                    "location_country": loc["location_country"],
-                    "industry_name": ind["industry_name"],
-                }
+    with span("load.companies.read") as read_span:
+        if backfill:
+            expanded_df = read_backfill(
+                "companies", "company_id", ["locations", "industries"]
             )
-
-    expanded_df = pd.DataFrame(records)
-
-    expanded_df.to_sql(
-        "companies", engine, schema=SUPABASE_SCHEMA, if_exists="append", index=False
-    )
+        elif has_parquet("companies"):
+            expanded_df = read_expanded(
+                "companies", "company_id", ["locations", "industries"]
+            )
+        else:
+            check_csv_fallback("companies", csv_path)
+            expanded_df = expand_csv(csv_path)
+        read_span.rows_out = len(expanded_df)
+
+    with span("load.companies.write", rows_in=len(expanded_df), method=LOAD_METHOD):
+        with transaction(conn) as conn:
+            write_raw(expanded_df, "companies", conn)
 
     print(f"✅ {len(expanded_df)} rows in {SUPABASE_SCHEMA}.companies loaded.")
@@ -1,17 +1,17 @@
-from config.config import SUPABASE_DB, SUPABASE_SSL_MODE
-from sqlalchemy import create_engine, text
+import re
 
+from config.db import transaction
+from etl.tracing import span
+from sqlalchemy import text
 
-def get_engine():
-    return create_engine(
-        f"postgresql+psycopg2://{SUPABASE_DB['user']}:{SUPABASE_DB['password']}@"
-        f"{SUPABASE_DB['host']}:{SUPABASE_DB['port']}/{SUPABASE_DB['database']}?sslmode={SUPABASE_SSL_MODE}"
-    )
 
+def insert_target(query):
+    """Target table of an INSERT query, i.e. norm.jobs."""
+    match = re.search(r"INSERT\s+INTO\s+([\w.]+)", query, re.IGNORECASE)
+    return match.group(1) if match else "query"
 
-def load_norm_tables():
-    engine = get_engine()
 
+def load_norm_tables(conn=None):
     queries = [
         # INDUSTRIES
         """
@@ -172,7 +172,7 @@ def load_norm_tables():
             cat.id
         FROM raw.salaries s
         LEFT JOIN norm.companies c 
-            ON LOWER(TRIM(c.name)) = LOWER(TRIM(s.company_name))
+            ON c.id = s.company_id
         LEFT JOIN norm.levels lvl 
             ON lvl.level = TRIM(s.level)
         LEFT JOIN norm.categories cat 
@@ -190,11 +190,6 @@ def load_norm_tables():
         """,
     ]
 
-    with engine.begin() as conn:
-        for q in queries:
-            conn.execute(text(q))
-
-    print("\n=== NORMALIZED TABLE COUNTS ===")
     counts = {
         "industries": "SELECT COUNT(*) FROM norm.industries;",
         "categories": "SELECT COUNT(*) FROM norm.categories;",
@@ -207,10 +202,17 @@ def load_norm_tables():
         "jobs_locations": "SELECT COUNT(*) FROM norm.jobs_locations;",
         "salaries": "SELECT COUNT(*) FROM norm.salaries;",
     }
-    with engine.connect() as conn:
+
+    with transaction(conn) as conn:
+        for q in queries:
+            with span(f"load.{insert_target(q)}") as query_span:
+                query_span.rows_out = conn.execute(text(q)).rowcount
+
+        # counted in the same transaction, before it is committed
+        print("\n=== NORMALIZED TABLE COUNTS ===")
         for table, query in counts.items():
             print(f"{table}: {conn.execute(text(query)).scalar()} rows")
-    print("================================\n")
+        print("================================\n")
 
 
 if __name__ == "__main__":
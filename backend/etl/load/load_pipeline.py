@@ -1,8 +1,11 @@
+import argparse
 import os
 import sys
 
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 
+from config.db import get_engine
+
 # load csv into raw
 from etl.load.companies_supabase import load_companies
 from etl.load.jobs_supabase import load_jobs
@@ -12,33 +15,57 @@ from etl.load.load_norm_tables import load_norm_tables
 
 # load norm into star
 from etl.load.load_star_tables import load_star_tables
+
+# add columns of newer releases to existing raw tables
+from etl.load.migrate_raw import migrate_raw_tables
 from etl.load.salaries_supabase import load_salaries
 
 # truncate raw tables
 from etl.load.truncate_raw import truncate_raw_tables
+from etl.tracing import span, trace_run
+
+
+def main(backfill=False):
+    """
+    Reload the raw tables from the processed data and rebuild the normalized and
+    star schema tables. With backfill=True the raw tables are loaded from all
+    backfill partitions (see etl.transform.backfill) instead.
 
+    All steps run on one connection of the shared engine in one transaction,
+    so a failed step leaves the previously loaded tables untouched.
+    """
+    with trace_run("load"), get_engine().begin() as conn:
+        with span("load.migrate"):
+            migrate_raw_tables(conn)
 
-def main():
-    print("Start truncate raw tables...")
-    truncate_raw_tables()
-    print("Truncated raw tables...")
+        print("Start truncate raw tables...")
+        with span("load.truncate"):
+            truncate_raw_tables(conn)
+        print("Truncated raw tables...")
 
-    print("Start loading CSVs into raw tables...")
-    load_companies()
-    load_jobs()
-    load_salaries()
-    print("CSV data loaded into raw tables.\n")
+        print("Start loading CSVs into raw tables...")
+        with span("load.raw", backfill=backfill):
+            load_companies(backfill, conn)
+            load_jobs(backfill, conn)
+            load_salaries(backfill, conn)
+        print("CSV data loaded into raw tables.\n")
 
-    print("Start loading normalized tables...")
-    load_norm_tables()
-    print("Normalized tables loaded.\n")
+        print("Start loading normalized tables...")
+        with span("load.norm"):
+            load_norm_tables(conn)
+        print("Normalized tables loaded.\n")
 
-    print("Start loading star schema tables...")
-    load_star_tables()
-    print("Star schema tables loaded.\n")
+        print("Start loading star schema tables...")
+        with span("load.star"):
+            load_star_tables(conn)
+        print("Star schema tables loaded.\n")
 
-    print("All data successfully loaded.")
+        print("All data successfully loaded.")
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--backfill", action="store_true", help="load the backfilled history"
+    )
+    main(parser.parse_args().backfill)
@@ -1,17 +1,10 @@
-from config.config import SUPABASE_DB, SUPABASE_SSL_MODE
-from sqlalchemy import create_engine, text
+from config.db import transaction
+from etl.load.load_norm_tables import insert_target
+from etl.tracing import span
+from sqlalchemy import text
 
 
-def get_engine():
-    return create_engine(
-        f"postgresql+psycopg2://{SUPABASE_DB['user']}:{SUPABASE_DB['password']}@"
-        f"{SUPABASE_DB['host']}:{SUPABASE_DB['port']}/{SUPABASE_DB['database']}?sslmode={SUPABASE_SSL_MODE}"
-    )
-
-
-def load_star_tables():
-    engine = get_engine()
-
+def load_star_tables(conn=None):
     queries = [
         # =========================================
         # DIM COMPANIES
@@ -166,14 +159,7 @@ def load_star_tables():
     ]
 
     # ----------------------------
-    # Execute queries
-    # ----------------------------
-    with engine.begin() as conn:
-        for q in queries:
-            conn.execute(text(q))
-
-    # ----------------------------
-    # Print counts
+    # Execute queries, print counts
     # ----------------------------
     count_queries = {
         "dim_companies": "SELECT COUNT(*) FROM star.dim_companies;",
@@ -185,11 +171,16 @@ def load_star_tables():
         "fact_job_postings": "SELECT COUNT(*) FROM star.fact_job_postings;",
     }
 
-    print("\n=== STAR SCHEMA TABLE COUNTS ===")
-    with engine.connect() as conn:
+    with transaction(conn) as conn:
+        for q in queries:
+            with span(f"load.{insert_target(q)}") as query_span:
+                query_span.rows_out = conn.execute(text(q)).rowcount
+
+        # counted in the same transaction, before it is committed
+        print("\n=== STAR SCHEMA TABLE COUNTS ===")
         for table, query in count_queries.items():
             print(f"{table}: {conn.execute(text(query)).scalar()} rows")
-    print("================================\n")
+        print("================================\n")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,19 @@
+from config.db import transaction
+from sqlalchemy import text
+
+# Idempotent changes of raw tables that already exist in deployed databases,
+# see tables/DDL/DDL_raw.sql
+MIGRATIONS = [
+    "ALTER TABLE raw.salaries ADD COLUMN IF NOT EXISTS company_id BIGINT;",
+]
+
+
+def migrate_raw_tables(conn=None):
+    with transaction(conn) as conn:
+        for statement in MIGRATIONS:
+            conn.execute(text(statement))
+    print("🛠️ raw tables migrated.")
+
+
+if __name__ == "__main__":
+    migrate_raw_tables()
@@ -0,0 +1,160 @@
+"""Reading the processed output of the transform step for the raw loaders."""
+
+import ast
+import os
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import pandas as pd
+from config.config import BACKFILL_DATA_DIR, PROCESSED_CSV_OUTPUT, PROCESSED_DATA_DIR
+from etl.transform.save import parquet_path
+
+# Raw columns of the entries of a nested CSV column: raw column -> keys of the
+# entry, the first non-empty one wins (i.e. subdivision_code, else state)
+NESTED_FIELDS = {
+    "locations": {
+        "location_city": ("city",),
+        "location_state": ("subdivision_code", "state"),
+        "location_country": ("country_code", "country"),
+    },
+    "industries": {"industry_name": ("name",)},
+}
+
+_KEY = "_nested_value"
+
+
+def has_parquet(name: str, folder_path: str = PROCESSED_DATA_DIR) -> bool:
+    return os.path.exists(parquet_path(name, folder_path))
+
+
+def check_csv_fallback(name: str, csv_path: str):
+    """
+    Raise unless the processed CSV file can stand in for a missing <name>.parquet.
+    The CSV files are only kept up to date by the transform with
+    PROCESSED_CSV_OUTPUT=true, otherwise they hold the data of an older run.
+    """
+    if not PROCESSED_CSV_OUTPUT:
+        raise FileNotFoundError(
+            f"No processed {name}.parquet in {PROCESSED_DATA_DIR}, run the transform "
+            "step first (the CSV files are only updated with PROCESSED_CSV_OUTPUT=true)"
+        )
+    if not os.path.exists(csv_path):
+        raise FileNotFoundError(f"No processed {name}.parquet or {csv_path}")
+    print(f"⚠️ No processed {name}.parquet, loading {csv_path} instead")
+
+
+def read_expanded(
+    name: str,
+    id_column: str,
+    nested_columns: List[str],
+    folder_path: str = PROCESSED_DATA_DIR,
+) -> pd.DataFrame:
+    """
+    Read <name>.parquet and join its child tables (see etl.transform.save): one
+    row per combination of child entries of a record (i.e. location x industry)
+    and one row with empty child fields for records without entries, like the
+    rows the loaders build from the CSV files. Nothing has to be parsed.
+    """
+    df = pd.read_parquet(parquet_path(name, folder_path))
+    for column in nested_columns:
+        child = pd.read_parquet(parquet_path(f"{name}_{column}", folder_path))
+        df = df.merge(child.drop(columns="position"), on=id_column, how="left")
+
+    # the raw tables use TIMESTAMP columns, so store UTC wall time like the CSV text did
+    for col in df.select_dtypes("datetimetz").columns:
+        df[col] = df[col].dt.tz_convert(None)
+    return df
+
+
+def read_backfill(
+    name: str,
+    id_column: str,
+    nested_columns: List[str],
+    root: str = BACKFILL_DATA_DIR,
+) -> pd.DataFrame:
+    """
+    Read all backfill partitions of a dataset (see etl.transform.backfill) like
+    read_expanded, for a bulk load of the rebuilt history. A record that occurs
+    in several snapshots is taken from the newest one.
+    """
+    # <name>/date=<YYYY-MM-DD>/<source>_<run_id>/, newest snapshot first
+    partitions = sorted(
+        (p for p in Path(root, name).glob("date=*/*") if has_parquet(name, str(p))),
+        key=lambda p: (p.parent.name, p.name[-15:]),
+        reverse=True,
+    )
+    frames, seen = [], set()
+    for partition in partitions:
+        df = read_expanded(name, id_column, nested_columns, str(partition))
+        df = df[~df[id_column].isin(seen)]
+        seen.update(df[id_column].unique().tolist())
+        frames.append(df)
+
+    if not frames:
+        raise FileNotFoundError(f"No backfill partitions of {name} in {root}")
+    return pd.concat(frames, ignore_index=True)
+
+
+def _parse_entries(value) -> list:
+    """Entries of a nested CSV cell (the repr of a list of dicts), [] if empty or invalid."""
+    if not isinstance(value, str) or not value.strip():
+        return []
+    try:
+        entries = ast.literal_eval(value)
+    except Exception:
+        return []
+    return list(entries) if isinstance(entries, (list, tuple)) else []
+
+
+def _entry_field(entry, keys: Tuple[str, ...]):
+    if not isinstance(entry, dict):
+        return None
+    value = None
+    for key in keys:
+        value = entry.get(key)
+        if value:
+            break
+    return value
+
+
+def nested_lookup(
+    values: pd.Series, fields: Dict[str, Tuple[str, ...]]
+) -> pd.DataFrame:
+    """
+    Raw columns of every distinct value of a nested CSV column: one row per
+    entry, one row of empty fields for values without entries. Every distinct
+    value is parsed only once.
+    """
+    distinct = pd.Series(values.unique(), dtype=object)
+    entries = distinct.map(_parse_entries).explode()
+    lookup = pd.DataFrame(
+        {
+            column: [_entry_field(entry, keys) for entry in entries]
+            for column, keys in fields.items()
+        },
+        index=entries.index,
+    )
+    lookup.insert(0, _KEY, distinct[entries.index].to_numpy())
+    return lookup
+
+
+def expand_nested(df: pd.DataFrame, nested_columns: List[str]) -> pd.DataFrame:
+    """
+    Replace the nested CSV columns (i.e. locations, industries) by their raw
+    columns, with one row per combination of their entries (location x
+    industry, in the order of the entries) like read_expanded. Only the
+    distinct cell values are parsed, the rows are expanded by merges.
+    """
+    for column in nested_columns:
+        if column in df:
+            values = df[column].astype(object).fillna("")
+        else:
+            values = pd.Series("", index=df.index, dtype=object)
+        lookup = nested_lookup(values, NESTED_FIELDS[column])
+        df = (
+            df.drop(columns=column, errors="ignore")
+            .assign(**{_KEY: values})
+            .merge(lookup, on=_KEY, how="left")
+            .drop(columns=_KEY)
+        )
+    return df
@@ -1,17 +1,9 @@
-from config.config import SUPABASE_DB, SUPABASE_SSL_MODE
-from sqlalchemy import create_engine, text
+from config.db import transaction
+from sqlalchemy import text
 
 
-def get_engine():
-    return create_engine(
-        f"postgresql+psycopg2://{SUPABASE_DB['user']}:{SUPABASE_DB['password']}@"
-        f"{SUPABASE_DB['host']}:{SUPABASE_DB['port']}/{SUPABASE_DB['database']}?sslmode={SUPABASE_SSL_MODE}"
-    )
-
-
-def truncate_raw_tables():
-    engine = get_engine()
-    with engine.begin() as conn:
+def truncate_raw_tables(conn=None):
+    with transaction(conn) as conn:
         conn.execute(text("TRUNCATE raw.companies;"))
         conn.execute(text("TRUNCATE raw.jobs;"))
         conn.execute(text("TRUNCATE raw.salaries;"))
@@ -0,0 +1,264 @@
+"""Lightweight tracing of the ETL stages.
+
+A run (`trace_run`) collects nested spans (`span`) and writes them to one JSON
+trace file per run under `data/traces/`. Every span records its wall time,
+CPU time (of this process and of finished child processes), optional rows in
+and rows out, the peak RSS of the process at its end and how much the span
+raised that peak. Spans opened outside a run are measured but not recorded,
+so instrumented functions also work when they are called on their own.
+
+    with trace_run("transform"):
+        with span("transform.jobs") as s:
+            df = run_jobs()
+            s.rows_out = len(df)
+
+Usage (from backend/):
+    python -m etl.tracing list
+    python -m etl.tracing report [trace file, default: latest] [--top 10]
+"""
+
+import argparse
+import contextvars
+import glob
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Optional
+
+from config.config import TRACES_DIR, TRACING_ENABLED
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process in MB, None if unknown."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # bytes on macOS, kilobytes on Linux
+    return peak / 1024**2 if sys.platform == "darwin" else peak / 1024
+
+
+def cpu_seconds() -> float:
+    """User and system CPU time of this process and its finished children."""
+    times = os.times()
+    return times.user + times.system + times.children_user + times.children_system
+
+
+class Span:
+    """One timed step. rows_in, rows_out and attrs can be set while it is open."""
+
+    def __init__(self, name, span_id, parent_id, rows_in=None, **attrs):
+        self.name = name
+        self.id = span_id
+        self.parent_id = parent_id
+        self.rows_in = rows_in
+        self.rows_out = None
+        self.attrs = attrs
+        self.status = "ok"
+        self.error = None
+        self.start_offset = 0.0
+        self.wall_seconds = None
+        self.cpu_seconds = None
+        self.peak_rss_mb = None
+        self.rss_growth_mb = None
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start_offset": round(self.start_offset, 6),
+            "wall_seconds": round(self.wall_seconds, 6),
+            "cpu_seconds": round(self.cpu_seconds, 6),
+            "rows_in": self.rows_in,
+            "rows_out": self.rows_out,
+            "peak_rss_mb": self.peak_rss_mb,
+            "rss_growth_mb": self.rss_growth_mb,
+            "status": self.status,
+            "error": self.error,
+            "attrs": self.attrs,
+        }
+
+
+class Tracer:
+    """Spans of one run, written to <traces_dir>/<name>_<timestamp>.json."""
+
+    def __init__(self, name, traces_dir=TRACES_DIR):
+        self.name = name
+        self.traces_dir = traces_dir
+        self.started_at = datetime.now()
+        self.started = time.perf_counter()
+        self.spans = []
+        self.root_id = None
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+    def new_id(self):
+        with self._lock:
+            self._next_id += 1
+            return self._next_id
+
+    def record(self, span):
+        with self._lock:
+            self.spans.append(span)
+
+    def write(self):
+        os.makedirs(self.traces_dir, exist_ok=True)
+        path = os.path.join(
+            self.traces_dir,
+            f"{self.name}_{self.started_at.strftime('%Y%m%d_%H%M%S')}.json",
+        )
+        trace = {
+            "name": self.name,
+            "started_at": self.started_at.isoformat(),
+            "pid": os.getpid(),
+            "spans": [s.to_dict() for s in sorted(self.spans, key=lambda s: s.id)],
+        }
+        with open(f"{path}.tmp", "w", encoding="utf-8") as f:
+            json.dump(trace, f, indent=2, default=str)
+        os.replace(f"{path}.tmp", path)
+        return path
+
+
+_tracer: Optional[Tracer] = None
+_current_span = contextvars.ContextVar("current_span", default=None)
+
+
+@contextmanager
+def span(name, rows_in=None, **attrs):
+    """
+    Measure a step. Nested spans become children of the enclosing span; spans
+    opened in worker threads are attached to the root span of the run.
+    """
+    tracer = _tracer
+    parent = _current_span.get()
+    parent_id = parent.id if parent else (tracer.root_id if tracer else None)
+    current = Span(
+        name, tracer.new_id() if tracer else 0, parent_id, rows_in=rows_in, **attrs
+    )
+    token = _current_span.set(current)
+
+    peak_before = peak_rss_mb()
+    cpu_before = cpu_seconds()
+    started = time.perf_counter()
+    if tracer:
+        current.start_offset = started - tracer.started
+    try:
+        yield current
+    except BaseException as exc:
+        current.status = "error"
+        current.error = f"{type(exc).__name__}: {exc}"
+        raise
+    finally:
+        current.wall_seconds = time.perf_counter() - started
+        current.cpu_seconds = cpu_seconds() - cpu_before
+        current.peak_rss_mb = peak_rss_mb()
+        if peak_before is not None:
+            current.rss_growth_mb = round(current.peak_rss_mb - peak_before, 3)
+            current.peak_rss_mb = round(current.peak_rss_mb, 3)
+        _current_span.reset(token)
+        if tracer:
+            tracer.record(current)
+
+
+@contextmanager
+def trace_run(name, traces_dir=TRACES_DIR):
+    """
+    Root span of a run. Writes the trace file when the run ends (also on
+    errors). Inside an active run, it is an ordinary span of that run.
+    """
+    global _tracer
+    if _tracer is not None or not TRACING_ENABLED:
+        with span(name) as root:
+            yield root
+        return
+
+    _tracer = Tracer(name, traces_dir)
+    try:
+        with span(name) as root:
+            _tracer.root_id = root.id
+            yield root
+    finally:
+        tracer, _tracer = _tracer, None
+        path = tracer.write()
+        print(f"🧭 Trace written to {path}")
+
+
+# ---------- Report ----------
+
+
+def list_traces(traces_dir=TRACES_DIR):
+    return sorted(glob.glob(os.path.join(traces_dir, "*.json")), key=os.path.getmtime)
+
+
+def _format_rows(value):
+    return "" if value is None else str(value)
+
+
+def format_report(trace, top=10):
+    """Span tree of a trace plus the slowest leaf spans, as text."""
+    spans = trace["spans"]
+    children = {}
+    for s in spans:
+        children.setdefault(s["parent_id"], []).append(s)
+
+    lines = [
+        f"Trace '{trace['name']}' started {trace['started_at']}",
+        "",
+        f"{'span':<48} {'wall s':>9} {'cpu s':>9} {'rows in':>9} "
+        f"{'rows out':>9} {'peak MB':>8} {'+MB':>7}",
+    ]
+    lines.append("-" * len(lines[-1]))
+
+    def walk(parent_id, depth):
+        for s in sorted(children.get(parent_id, []), key=lambda s: s["start_offset"]):
+            name = ("  " * depth + s["name"])[:48]
+            if s["status"] != "ok":
+                name = name[:46] + " !"
+            lines.append(
+                f"{name:<48} {s['wall_seconds']:>9.3f} {s['cpu_seconds']:>9.3f} "
+                f"{_format_rows(s['rows_in']):>9} {_format_rows(s['rows_out']):>9} "
+                f"{s['peak_rss_mb'] or 0:>8.0f} {s['rss_growth_mb'] or 0:>7.1f}"
+            )
+            walk(s["id"], depth + 1)
+
+    walk(None, 0)
+
+    leaves = [s for s in spans if s["id"] not in children]
+    if leaves:
+        lines += ["", f"Slowest steps (top {top}):"]
+        for s in sorted(leaves, key=lambda s: -s["wall_seconds"])[:top]:
+            lines.append(f"  {s['wall_seconds']:>9.3f}s  {s['name']}")
+
+    errors = [s for s in spans if s["status"] != "ok"]
+    if errors:
+        lines += ["", "Failed spans:"]
+        lines += [f"  {s['name']}: {s['error']}" for s in errors]
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("command", choices=["list", "report"], nargs="?")
+    parser.add_argument("trace", nargs="?", help="trace file, default: latest")
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    traces = list_traces()
+    if args.command == "list":
+        for path in traces:
+            print(path)
+    else:
+        path = args.trace or (traces[-1] if traces else None)
+        if path is None:
+            raise SystemExit(f"No traces in {TRACES_DIR}")
+        with open(path, "r", encoding="utf-8") as f:
+            print(format_report(json.load(f), args.top))
@@ -0,0 +1,235 @@
+"""Backfill: reprocess all archived raw snapshots.
+
+Discovers the snapshots in the archive manifest (see etl.extract.archive) and
+in not yet imported legacy folders `data/raw/archive/<dataset>/archive_*/`,
+transforms every snapshot on its own with run_jobs/run_companies/run_salaries
+in a process pool and writes one partition per snapshot:
+
+    data/processed/backfill/<dataset>/date=<YYYY-MM-DD>/<source>_<run_id>/
+        <dataset>.parquet, <dataset>_<nested column>.parquet
+
+Finished snapshots are recorded in `backfill/progress.json` with the hash of
+their content and the fingerprint of the transform (see
+etl.transform.incremental.transform_fingerprint), so an interrupted
+backfill resumes where it stopped and only snapshots whose content or
+cleaning rules changed are transformed again. Salaries snapshots run after
+all others and get the company_id of the processed companies, else of the
+backfilled ones; without any companies they fail. The load stage reads all
+partitions at once with etl.load.processed.read_backfill.
+
+Usage (from backend/):
+    python -m etl.transform.backfill [--dataset jobs] [--workers 4] [--force]
+"""
+
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+from config.config import BACKFILL_DATA_DIR, BACKFILL_WORKERS, RAW_DATA_ARCHIVE_DIR
+from etl.extract import archive
+from etl.extract.raw_sink import list_raw_files
+from etl.transform import save
+from etl.transform.clean import setup_logging
+from etl.transform.company_resolver import (
+    add_company_ids,
+    load_backfill_company_index,
+    load_company_index,
+)
+from etl.transform.incremental import file_hash, transform_fingerprint
+from etl.transform.pipeline_transform import DATASETS
+
+PROGRESS_FILE = os.path.join(BACKFILL_DATA_DIR, "progress.json")
+
+
+def discover_snapshots(datasets=None, archive_dir=RAW_DATA_ARCHIVE_DIR):
+    """
+    All archived snapshots as dicts (dataset, source, run_id, created_at, path,
+    hash), oldest first. Legacy folder snapshots that are also in the manifest
+    are only listed once.
+    """
+    datasets = datasets or list(DATASETS)
+    snapshots = {}
+
+    conn = archive.connect(os.path.join(archive_dir, "manifest.sqlite"))
+    try:
+        for dataset in datasets:
+            for row in archive.list_snapshots(dataset, conn=conn):
+                key = (dataset, row["source"], row["run_id"])
+                snapshots[key] = {
+                    "dataset": dataset,
+                    "source": row["source"],
+                    "run_id": row["run_id"],
+                    "created_at": row["created_at"],
+                    "path": archive.blob_path(
+                        row["blob_hash"], os.path.join(archive_dir, "blobs")
+                    ),
+                    "hash": row["blob_hash"],
+                }
+    finally:
+        conn.close()
+
+    for dataset in datasets:
+        for folder in sorted(Path(archive_dir, dataset).glob("archive_*")):
+            for path in list_raw_files(str(folder)):
+                source, run_id, created_at = archive.parse_snapshot_name(path)
+                key = (dataset, source, run_id)
+                if key not in snapshots:
+                    snapshots[key] = {
+                        "dataset": dataset,
+                        "source": source,
+                        "run_id": run_id,
+                        "created_at": created_at,
+                        "path": path,
+                        "hash": file_hash(path),
+                    }
+
+    return sorted(snapshots.values(), key=lambda s: (s["created_at"], s["dataset"]))
+
+
+def snapshot_key(snapshot):
+    return f"{snapshot['dataset']}/{snapshot['source']}_{snapshot['run_id']}"
+
+
+def partition_dir(snapshot, root=BACKFILL_DATA_DIR):
+    """Output folder of a snapshot, i.e. jobs/date=2025-12-07/muse_jobs_all_20251207_152325."""
+    return os.path.join(
+        root,
+        snapshot["dataset"],
+        f"date={snapshot['created_at'][:10]}",
+        f"{snapshot['source']}_{snapshot['run_id']}",
+    )
+
+
+def transform_snapshot(snapshot, root=BACKFILL_DATA_DIR):
+    """Transform one snapshot into its partition. Runs in a worker process."""
+    run_func, _, _, id_column, nested_columns, _ = DATASETS[snapshot["dataset"]]
+    df = run_func(files=[snapshot["path"]])
+    if snapshot["dataset"] == "salaries":
+        # resolved against the latest processed companies, else the backfilled ones
+        index = load_company_index() or load_backfill_company_index(root)
+        if index is None:
+            raise FileNotFoundError(
+                "Processed or backfilled companies are needed to resolve salaries"
+            )
+        df = add_company_ids(df, index)
+    folder = partition_dir(snapshot, root)
+    os.makedirs(folder, exist_ok=True)
+    save.save_as_parquet(df, snapshot["dataset"], folder, id_column, nested_columns)
+    return len(df)
+
+
+def load_progress(path=PROGRESS_FILE):
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    return {}
+
+
+def save_progress(progress, path=PROGRESS_FILE):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(progress, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def snapshot_fingerprint(snapshot):
+    return transform_fingerprint(snapshot["dataset"], DATASETS[snapshot["dataset"]][1])
+
+
+def is_done(snapshot, progress, root=BACKFILL_DATA_DIR):
+    entry = progress.get(snapshot_key(snapshot))
+    return (
+        entry is not None
+        and entry["hash"] == snapshot["hash"]
+        and entry.get("fingerprint") == snapshot_fingerprint(snapshot)
+        and os.path.isdir(partition_dir(snapshot, root))
+    )
+
+
+def run_backfill(
+    datasets=None,
+    workers=BACKFILL_WORKERS,
+    force=False,
+    archive_dir=RAW_DATA_ARCHIVE_DIR,
+    root=BACKFILL_DATA_DIR,
+):
+    """
+    Transform all archived snapshots that are not done yet in a process pool.
+    Args:
+        datasets (list[str]): Datasets to backfill, defaults to all.
+        workers (int): Worker processes.
+        force (bool): Transform all snapshots again, ignoring the progress file.
+    Returns:
+        dict: Counts of "done", "skipped" and "failed" snapshots.
+    """
+    setup_logging()
+    progress_path = os.path.join(root, "progress.json")
+    progress = {} if force else load_progress(progress_path)
+    snapshots = discover_snapshots(datasets, archive_dir)
+    todo = [s for s in snapshots if not is_done(s, progress, root)]
+    skipped = len(snapshots) - len(todo)
+    print(
+        f"🗂️ {len(snapshots)} archived snapshots, {skipped} already backfilled, "
+        f"{len(todo)} to transform with {workers} workers"
+    )
+
+    started = time.perf_counter()
+    failed = []
+    done = 0
+    # salaries are resolved against the companies, so they are transformed last
+    phases = [
+        [s for s in todo if s["dataset"] != "salaries"],
+        [s for s in todo if s["dataset"] == "salaries"],
+    ]
+    with ProcessPoolExecutor(
+        max_workers=max(1, min(workers, len(todo))), initializer=setup_logging
+    ) as executor:
+        for phase in phases:
+            futures = {executor.submit(transform_snapshot, s, root): s for s in phase}
+            for future in as_completed(futures):
+                done += 1
+                snapshot = futures[future]
+                key = snapshot_key(snapshot)
+                try:
+                    rows = future.result()
+                except Exception as exc:
+                    failed.append(key)
+                    print(f"❌ [{done}/{len(todo)}] {key}: {exc}")
+                    continue
+
+                progress[key] = {
+                    "hash": snapshot["hash"],
+                    "fingerprint": snapshot_fingerprint(snapshot),
+                    "rows": rows,
+                    "partition": os.path.relpath(partition_dir(snapshot, root), root),
+                }
+                save_progress(progress, progress_path)
+
+                elapsed = time.perf_counter() - started
+                eta = elapsed / done * (len(todo) - done)
+                print(
+                    f"✅ [{done}/{len(todo)}] {key}: {rows} rows "
+                    f"({elapsed:.0f}s elapsed, ~{eta:.0f}s left)"
+                )
+
+    if failed:
+        print(f"⚠️ {len(failed)} snapshots failed, run the backfill again to retry")
+    return {"done": len(todo) - len(failed), "skipped": skipped, "failed": len(failed)}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--dataset", action="append", choices=sorted(DATASETS))
+    parser.add_argument("--workers", type=int, default=BACKFILL_WORKERS)
+    parser.add_argument(
+        "--force", action="store_true", help="transform all snapshots again"
+    )
+    args = parser.parse_args()
+
+    result = run_backfill(args.dataset, args.workers, args.force)
+    if result["failed"]:
+        raise SystemExit(1)
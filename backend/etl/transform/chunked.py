@@ -0,0 +1,127 @@
+"""Chunked transform with bounded memory.
+
+Raw records are projected and cleaned in batches of TRANSFORM_BATCH_SIZE
+records with the same clean functions as the full transform, and every
+cleaned batch is appended to the processed Parquet output (and the CSV file,
+if enabled). Only one batch is held in memory at a time, plus the ids of the
+records seen so far in an `IdSet` (8 bytes per id) to drop duplicates across
+batches. Like in the full transform, the first occurrence of an id wins.
+"""
+
+import os
+from typing import Callable, List
+
+import numpy as np
+from etl.extract.raw_sink import list_raw_files
+from etl.tracing import span
+from etl.transform import clean
+from etl.transform.projection import iter_projected
+from etl.transform.save import ParquetAppender
+
+
+class IdSet:
+    """Set of integer ids kept as one sorted numpy array."""
+
+    def __init__(self):
+        self._ids = np.empty(0, dtype=np.int64)
+
+    def __len__(self):
+        return len(self._ids)
+
+    def add_new(self, ids) -> np.ndarray:
+        """
+        Add ids to the set. Returns a mask of the ids that were not in the set
+        before and occur for the first time in ids.
+        """
+        ids = np.asarray(ids, dtype=np.int64)
+        _, first = np.unique(ids, return_index=True)
+        is_first = np.zeros(len(ids), dtype=bool)
+        is_first[first] = True
+
+        if len(self._ids):
+            positions = np.searchsorted(self._ids, ids).clip(max=len(self._ids) - 1)
+            seen = self._ids[positions] == ids
+        else:
+            seen = np.zeros(len(ids), dtype=bool)
+
+        new = is_first & ~seen
+        self._ids = np.union1d(self._ids, ids[new])
+        return new
+
+
+def append_batch(df, data_type, seen, output, csv_path=None, enrich=None):
+    """Deduplicate, clean and append one batch. Returns the rows written."""
+    # keep the first occurrence of every id over all batches
+    df = df[seen.add_new(df[output.id_column].astype("int64"))]
+    if df.empty:
+        return df
+    df = clean.data_cleaning(df.reset_index(drop=True), data_type)
+    if df.empty:
+        return df
+    if enrich:
+        df = enrich(df)
+
+    output.append(df)
+    if csv_path:
+        df.to_csv(
+            f"{csv_path}.tmp",
+            mode="w" if output.rows == len(df) else "a",
+            header=output.rows == len(df),
+            index=False,
+        )
+    return df
+
+
+def transform_chunked(
+    data_type: str,
+    files_dir: str,
+    cols: List[str],
+    new_col_names: List[str],
+    id_column: str,
+    nested_columns: List[str],
+    batch_size: int,
+    folder_path: str,
+    csv_file: str = None,
+    files: List[str] = None,
+    enrich: Callable = None,
+) -> int:
+    """
+    Transform raw files batch by batch and append the cleaned batches to
+    <data_type>.parquet and its child tables in folder_path.
+    Args:
+        data_type (str): Dataset type ("jobs", "companies", "salaries").
+        files_dir (str): Directory containing raw snapshot files.
+        cols (list[str]): Dotted paths to extract (see transform.flatten_json).
+        new_col_names (list[str]): Output column names.
+        id_column (str): Column identifying a record, used to drop duplicates.
+        nested_columns (list[str]): List columns stored as child tables.
+        batch_size (int): Raw records per batch.
+        folder_path (str): Output folder.
+        csv_file (str): Also append the batches to this CSV file in folder_path.
+        files (list[str]): Transform these raw files instead of all files in files_dir.
+        enrich (callable): Applied to every cleaned batch before it is written.
+    Returns:
+        int: Number of rows written.
+    """
+    if files is None:
+        files = list_raw_files(files_dir)
+    if not files:
+        raise FileNotFoundError(f"No raw {data_type} files found in {files_dir}")
+
+    csv_path = os.path.join(folder_path, csv_file) if csv_file else None
+    seen = IdSet()
+    batches = 0
+
+    with ParquetAppender(data_type, folder_path, id_column, nested_columns) as output:
+        for df in iter_projected(files, cols, batch_size):
+            batches += 1
+            with span("batch", rows_in=len(df), batch=batches) as s:
+                df.columns = new_col_names
+                df = append_batch(df, data_type, seen, output, csv_path, enrich)
+                s.rows_out = len(df)
+            print(f"🧩 {data_type}: batch {batches}, {output.rows} rows written")
+
+    if csv_path and output.rows:
+        os.replace(f"{csv_path}.tmp", csv_path)
+    print(f"✅ {data_type}: {output.rows} rows in {batches} batches of {batch_size}")
+    return output.rows
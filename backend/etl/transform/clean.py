@@ -3,16 +3,20 @@ import os
 from typing import List
 
 import pandas as pd
+from etl.tracing import span
 from etl.transform.clean_helpers import (
+    apply_per_location,
     clean_location_adzuna,
     clean_location_muse,
+    classify_categories,
     clean_string,
     drop_invalid_rows,
-    extract_category,
+    empty_values,
     extract_level,
     log_null_values,
     remove_duplicates,
 )
+from etl.transform.dtypes import compact_dtypes
 
 # ---------- Logging Setup ----------
 
@@ -56,11 +60,14 @@ def clean_jobs(df: pd.DataFrame) -> pd.DataFrame:
     df = remove_duplicates(df, ["job_id"], "jobs")
     df["job_name"] = df["job_name"].str.strip()
     df["categories"] = df["categories"].apply(
-        lambda x: x[0]["name"]
-        if isinstance(x, list) and len(x) > 0 and "name" in x[0]
-        else None
+        lambda x: (
+            x[0]["name"]
+            if isinstance(x, list) and len(x) > 0 and "name" in x[0]
+            else None
+        )
     )
-    df["locations"] = df["locations"].apply(clean_location_muse)
+    with span("clean.locations"):
+        df["locations"] = apply_per_location(df["locations"], clean_location_muse)
     df = common_cleaning(df, "jobs", subset_delete_nulls=["locations"])
     return df
 
@@ -83,7 +90,8 @@ def clean_companies(df: pd.DataFrame) -> pd.DataFrame:
         df["description"].astype(str).str.replace(r"\s+", " ", regex=True).str.strip()
     )
     df = remove_duplicates(df, ["company_id"], "companies")
-    df["locations"] = df["locations"].apply(clean_location_muse)
+    with span("clean.locations"):
+        df["locations"] = apply_per_location(df["locations"], clean_location_muse)
     df = common_cleaning(df, "companies", subset_delete_nulls=[])
     return df
 
@@ -108,12 +116,15 @@ def clean_salaries(df: pd.DataFrame) -> pd.DataFrame:
 
     # extract and normalize titles and levels
     df["clean_title"] = df["adz_job_name"].apply(clean_string)
-    df["categories"] = df["clean_title"].apply(extract_category)
-    df["level"] = df["clean_title"].apply(extract_level)
+    with span("clean.categories", rows_in=len(df)):
+        df["categories"] = classify_categories(df["clean_title"])
+    with span("clean.levels", rows_in=len(df)):
+        df["level"] = df["clean_title"].apply(extract_level)
     df = df.drop("clean_title", axis=1)
 
     # normalize locations
-    df["locations"] = df["locations"].apply(clean_location_adzuna)
+    with span("clean.locations"):
+        df["locations"] = apply_per_location(df["locations"], clean_location_adzuna)
 
     df = common_cleaning(
         df, "salaries", subset_delete_nulls=["salary_min", "salary_max", "company_name"]
@@ -126,7 +137,8 @@ def common_cleaning(
 ) -> pd.DataFrame:
     """
     Apply shared final cleaning steps to a DataFrame. Replaces empty strings and empty lists/dicts with null values,
-    logs missing data, and removes invalid rows.
+    logs missing data, and removes invalid rows. Only object and string columns are checked for empty values,
+    with one vectorized length check per column; the null counts for the log are taken in the same pass.
     Args:
         df (pd.DataFrame): Input DataFrame.
         data_type (str): Dataset name for logging (e.g. "jobs", "companies", "salaries").
@@ -135,14 +147,26 @@ def common_cleaning(
         pd.DataFrame: Cleaned DataFrame.
     """
 
+    with span("clean.common", rows_in=len(df)) as s:
+        df = _common_cleaning(df, data_type, subset_delete_nulls)
+        s.rows_out = len(df)
+    return df
+
+
+def _common_cleaning(df, data_type, subset_delete_nulls):
     # transform empty strings and lists to null values
-    df = df.replace(r"^$", pd.NA, regex=True)
+    null_counts = {}
     for col in df.columns:
-        df[col] = df[col].apply(
-            lambda x: pd.NA if isinstance(x, (list, dict)) and len(x) == 0 else x
-        )
+        values = df[col]
+        nulls = values.isna()
+        if values.dtype == object or isinstance(values.dtype, pd.StringDtype):
+            empty = empty_values(values)
+            if empty.any():
+                df[col] = values.mask(empty, pd.NA)
+                nulls |= empty
+        null_counts[col] = int(nulls.sum())
     # log and clean null values
-    log_null_values(df, data_type)
+    log_null_values(df, data_type, pd.Series(null_counts, dtype="int64"))
     df = drop_invalid_rows(df, data_type, subset_delete_nulls)
     return df
 
@@ -152,7 +176,8 @@ def common_cleaning(
 
 def data_cleaning(df: pd.DataFrame, data_type: str) -> pd.DataFrame:
     """
-    Dispatch cleaning logic based on dataset type.
+    Dispatch cleaning logic based on dataset type and apply the dtype policy
+    (see etl.transform.dtypes) to the result.
     Args:
         df (pd.DataFrame): Raw input DataFrame.
         data_type (str): Dataset type ("jobs", "companies", "salaries").
@@ -172,6 +197,8 @@ def data_cleaning(df: pd.DataFrame, data_type: str) -> pd.DataFrame:
         cleaned_df = clean_salaries(df)
     else:
         raise ValueError(f"Unknown data type: {data_type}")
+    with span("clean.dtypes"):
+        cleaned_df = compact_dtypes(cleaned_df, data_type)
 
     logger.info(
         f"Finished cleaning '{data_type}'. Final record count: {len(cleaned_df)}"
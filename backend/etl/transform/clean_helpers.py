@@ -1,10 +1,12 @@
 import logging
 import re
+from functools import lru_cache
 from typing import Dict, List, Optional
 
+import numpy as np
 import pandas as pd
 import pycountry
-from rapidfuzz import fuzz
+from rapidfuzz import fuzz, process
 
 logger = logging.getLogger(__name__)
 
@@ -14,6 +16,7 @@ logger = logging.getLogger(__name__)
 US_STATE_CODES = {
     s.name: s.code.split("-")[1] for s in pycountry.subdivisions.get(country_code="US")
 }
+US_STATE_ABBREVIATIONS = set(US_STATE_CODES.values())
 
 CITY_NORMALIZATION_MAP = {
     # USA
@@ -23,6 +26,34 @@ CITY_NORMALIZATION_MAP = {
 
 UNMAPPED_COUNTRY_CODES = {"turkey": "TR", "uk": "GB"}
 
+# Lower-cased country codes and names -> ISO alpha-2, built once. The attribute
+# order follows the lookup order of pycountry.countries.lookup.
+COUNTRY_LOOKUP_FIELDS = (
+    "alpha_2",
+    "alpha_3",
+    "name",
+    "numeric",
+    "official_name",
+    "common_name",
+)
+
+
+def _build_country_index():
+    index = {}
+    for field in COUNTRY_LOOKUP_FIELDS:
+        for country in pycountry.countries:
+            value = getattr(country, field, None)
+            if value:
+                index.setdefault(value.lower(), country.alpha_2)
+    index.update(UNMAPPED_COUNTRY_CODES)
+    return index
+
+
+COUNTRY_INDEX = _build_country_index()
+
+# Upper bound of memoized country and city names
+LOCATION_CACHE_SIZE = 4096
+
 CITY_STATES = {
     "SG",  # Singapore
     "HK",  # Hong Kong
@@ -100,6 +131,18 @@ CATEGORY_KEYWORDS = {
     ],
 }
 
+# One precompiled alternation per category, tried in the order of CATEGORY_KEYWORDS
+CATEGORY_PATTERNS = {
+    cat: re.compile("|".join(re.escape(kw) for kw in kws))
+    for cat, kws in CATEGORY_KEYWORDS.items()
+}
+
+# Flat keyword list for the fuzzy fallback (same order as CATEGORY_KEYWORDS)
+FUZZY_KEYWORDS = [kw for kws in CATEGORY_KEYWORDS.values() for kw in kws]
+FUZZY_CATEGORIES = [cat for cat, kws in CATEGORY_KEYWORDS.items() for _ in kws]
+FUZZY_THRESHOLD = 80
+DEFAULT_CATEGORY = "Software Engineering"
+
 
 # ---------- Generic cleaning helpers functions ----------
 
@@ -128,6 +171,17 @@ def drop_invalid_rows(
     return df
 
 
+def empty_values(values: pd.Series) -> pd.Series:
+    """Mask of empty strings, lists and dicts in an object or string column."""
+    try:
+        # len() of strings and containers, NaN for anything else
+        lengths = values.str.len()
+    except AttributeError:
+        # column without any strings (i.e. only ints), .str is not available
+        lengths = values.map(lambda x: len(x) if isinstance(x, (list, dict)) else None)
+    return (lengths == 0).fillna(False).astype(bool)
+
+
 def clean_string(s):
     s = s.lower()
     s = re.sub(r"\([^)]*\)", "", s)  # Text in Klammern entfernen
@@ -140,7 +194,7 @@ def clean_string(s):
 
 
 def clean_location_muse(
-    loc_list: List[Dict[str, str]]
+    loc_list: List[Dict[str, str]],
 ) -> List[Dict[str, Optional[str]]]:
     """
     Normalize a list of location dictionaries into country, state, and city fields.
@@ -192,7 +246,7 @@ def clean_location_muse(
         state = None
         city, region = parts
 
-        if region in US_STATE_CODES.values():
+        if region in US_STATE_ABBREVIATIONS:
             country = "US"
             state = f"US-{region}"
         else:
@@ -245,19 +299,22 @@ def clean_location_adzuna(loc_list: List[str]) -> List[Dict[str, Optional[str]]]
     return cleaned
 
 
+@lru_cache(maxsize=LOCATION_CACHE_SIZE)
 def normalize_country(country_name: Optional[str]) -> Optional[str]:
     """Normalize a country name to its ISO alpha-2 code."""
     if not country_name:
         return None
     key = re.sub(r"[^\w\s]", "", country_name.lower()).strip()
-    if key in UNMAPPED_COUNTRY_CODES:
-        return UNMAPPED_COUNTRY_CODES[key]
+    if key in COUNTRY_INDEX:
+        return COUNTRY_INDEX[key]
+    # fields that are not in the index (rare), falls back to the full lookup
     try:
         return pycountry.countries.lookup(key).alpha_2
     except LookupError:
         return None
 
 
+@lru_cache(maxsize=LOCATION_CACHE_SIZE)
 def normalize_city(city: Optional[str]) -> Optional[str]:
     """Normalize a city name using a predefined mapping."""
     if not city:
@@ -269,28 +326,76 @@ def normalize_city(city: Optional[str]) -> Optional[str]:
         return city
 
 
+def location_key(loc_list):
+    """Hashable key of a Muse (list of dicts) or Adzuna (list of str) location list."""
+    if not isinstance(loc_list, list):
+        return None
+    return tuple(loc.get("name") if isinstance(loc, dict) else loc for loc in loc_list)
+
+
+def apply_per_location(locations: pd.Series, clean_func) -> pd.Series:
+    """
+    Apply a location cleaning function once per distinct location list and map
+    the result back to all rows. Rows with the same locations share the result.
+    """
+    keys = locations.map(location_key)
+    results = {}
+    for key, loc_list in zip(keys, locations):
+        if key not in results:
+            results[key] = clean_func(loc_list)
+    return pd.Series([results[key] for key in keys], index=locations.index)
+
+
 # ---------- Title specific helpers functions ----------
 
 
-def extract_category(title):
-    # keyword based matching
-    for cat, kws in CATEGORY_KEYWORDS.items():
-        if any(kw in title for kw in kws):
-            return cat
+def classify_categories(titles: pd.Series) -> pd.Series:
+    """
+    Assign a category to every (cleaned) title. Each distinct title is classified once:
+    the first category in CATEGORY_KEYWORDS with a keyword contained in the title wins.
+    Titles without a keyword fall back to the keyword with the best fuzzy
+    partial_ratio (first one on ties) if it scores at least FUZZY_THRESHOLD,
+    computed for all of them at once with rapidfuzz.process.cdist, and to
+    DEFAULT_CATEGORY otherwise.
+    Args:
+        titles (pd.Series): Lower-cased titles (see clean_string).
+    Returns:
+        pd.Series: Category per title, with the index of titles.
+    """
+    unique = pd.Series(titles.unique())
+    categories = pd.Series(None, index=unique.index, dtype=object)
+
+    # keyword based matching, in priority order
+    for cat, pattern in CATEGORY_PATTERNS.items():
+        open_rows = categories.isna()
+        if not open_rows.any():
+            break
+        matched = unique[open_rows].str.contains(pattern, regex=True)
+        categories[matched[matched].index] = cat
 
     # Fuzzy fallback
-    all_keys = [(kw, cat) for cat, kws in CATEGORY_KEYWORDS.items() for kw in kws]
-    best_kw, best_cat = None, None
-    best_score = 0
+    unmatched = categories.isna()
+    if unmatched.any():
+        scores = process.cdist(
+            unique[unmatched].tolist(),
+            FUZZY_KEYWORDS,
+            scorer=fuzz.partial_ratio,
+            dtype=np.float64,
+        )
+        best = scores.argmax(axis=1)
+        best_scores = scores[np.arange(len(best)), best]
+        categories[unmatched] = [
+            FUZZY_CATEGORIES[i] if score >= FUZZY_THRESHOLD else DEFAULT_CATEGORY
+            for i, score in zip(best, best_scores)
+        ]
+
+    mapping = dict(zip(unique, categories))
+    return titles.map(mapping)
 
-    for kw, cat in all_keys:
-        score = fuzz.partial_ratio(title, kw)
-        if score > best_score:
-            best_kw, best_cat, best_score = kw, cat, score
 
-    if best_score >= 80:
-        return best_cat
-    return "Software Engineering"
+def extract_category(title):
+    """Category of a single title, see classify_categories."""
+    return classify_categories(pd.Series([title])).iloc[0]
 
 
 def extract_level(title):
@@ -327,8 +432,10 @@ def extract_level(title):
 # ---------- Logging Function ----------
 
 
-def log_null_values(df, data_type):
-    null_counts = df.isnull().sum()
+def log_null_values(df, data_type, null_counts=None):
+    """Log the nulls per column; counts can be passed in if they are known already."""
+    if null_counts is None:
+        null_counts = df.isnull().sum()
     total_nulls = int(null_counts.sum())
     logger.info(f"Null value summary for '{data_type}':")
     for col, n in null_counts.items():
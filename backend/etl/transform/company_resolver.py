@@ -0,0 +1,151 @@
+"""Resolution of Adzuna company names to Muse company ids.
+
+Salaries only carry the company name Adzuna reports ("Cummins Inc.",
+"MASTERCARD", "The Walt Disney Company"). `CompanyIndex` normalizes the Muse
+company names once (case, punctuation, legal suffixes) into an exact-match
+index plus blocks keyed by the first token of the normalized name. Every
+distinct Adzuna name is resolved once: by an exact hit on the normalized
+name, otherwise by the best rapidfuzz match within its block. The resolved
+`company_id` lets the database join salaries to companies on an integer key.
+"""
+
+import logging
+import os
+import re
+from pathlib import Path
+from typing import Dict, Optional
+
+import pandas as pd
+from config.config import BACKFILL_DATA_DIR, PROCESSED_DATA_DIR
+from etl.transform.save import parquet_path
+from rapidfuzz import fuzz, process
+
+logger = logging.getLogger(__name__)
+
+# Words dropped from company names before matching
+LEGAL_SUFFIXES = {
+    "ag",
+    "co",
+    "company",
+    "corp",
+    "corporation",
+    "gmbh",
+    "group",
+    "inc",
+    "incorporated",
+    "limited",
+    "llc",
+    "llp",
+    "lp",
+    "ltd",
+    "plc",
+    "sa",
+    "se",
+    "the",
+}
+# Minimal token_sort_ratio of a fuzzy match within a block
+MATCH_THRESHOLD = 90
+
+
+def normalize_company_name(name) -> Optional[str]:
+    """Lower-cased company name without punctuation and legal suffixes, or None."""
+    if not isinstance(name, str):
+        return None
+    tokens = re.sub(r"[^\w\s]", " ", name.lower()).split()
+    kept = [t for t in tokens if t not in LEGAL_SUFFIXES]
+    return " ".join(kept or tokens) or None
+
+
+def block_key(normalized: str) -> str:
+    return normalized.split(" ", 1)[0]
+
+
+class CompanyIndex:
+    """
+    Normalized-name index of Muse companies.
+    Args:
+        companies (pd.DataFrame): Processed companies with company_id and company_name.
+    """
+
+    def __init__(self, companies: pd.DataFrame):
+        self.exact: Dict[str, int] = {}
+        self.blocks: Dict[str, Dict[str, int]] = {}
+        for company_id, name in zip(companies["company_id"], companies["company_name"]):
+            normalized = normalize_company_name(name)
+            if normalized is None or normalized in self.exact:
+                continue
+            self.exact[normalized] = int(company_id)
+            self.blocks.setdefault(block_key(normalized), {})[normalized] = int(
+                company_id
+            )
+
+    def resolve(self, name) -> Optional[int]:
+        """Company id of a name, or None if no company matches."""
+        normalized = normalize_company_name(name)
+        if normalized is None:
+            return None
+        if normalized in self.exact:
+            return self.exact[normalized]
+
+        block = self.blocks.get(block_key(normalized))
+        if not block:
+            return None
+        match = process.extractOne(
+            normalized,
+            list(block),
+            scorer=fuzz.token_sort_ratio,
+            score_cutoff=MATCH_THRESHOLD,
+        )
+        return block[match[0]] if match else None
+
+
+def resolve_company_ids(names: pd.Series, index: CompanyIndex) -> pd.Series:
+    """
+    Company ids for a column of company names (nullable Int64, <NA> if unresolved).
+    Every distinct name is resolved only once.
+    """
+    distinct = names.dropna().unique()
+    resolved = {name: index.resolve(name) for name in distinct}
+    matched = sum(company_id is not None for company_id in resolved.values())
+    logger.info(f"Resolved {matched} of {len(distinct)} distinct company names.")
+    return names.map(resolved).astype("Int64")
+
+
+def add_company_ids(salaries: pd.DataFrame, index: CompanyIndex) -> pd.DataFrame:
+    """Insert the resolved company_id column after company_name."""
+    salaries = salaries.drop(columns="company_id", errors="ignore")
+    company_ids = resolve_company_ids(salaries["company_name"].astype(object), index)
+    salaries.insert(
+        salaries.columns.get_loc("company_name") + 1, "company_id", company_ids
+    )
+    return salaries
+
+
+def load_company_index(folder_path: str = PROCESSED_DATA_DIR) -> Optional[CompanyIndex]:
+    """Index of the processed companies.parquet in folder_path, None if missing."""
+    path = parquet_path("companies", folder_path)
+    if not os.path.exists(path):
+        return None
+    return CompanyIndex(pd.read_parquet(path, columns=["company_id", "company_name"]))
+
+
+def load_backfill_company_index(
+    root: str = BACKFILL_DATA_DIR,
+) -> Optional[CompanyIndex]:
+    """
+    Index of the companies of all backfill partitions in root (see
+    etl.transform.backfill), newest snapshot first, None if there are none.
+    """
+    paths = sorted(
+        Path(root, "companies").glob("date=*/*/companies.parquet"),
+        key=lambda p: (p.parent.parent.name, p.parent.name[-15:]),
+        reverse=True,
+    )
+    if not paths:
+        return None
+    return CompanyIndex(
+        pd.concat(
+            [pd.read_parquet(p, columns=["company_id", "company_name"]) for p in paths],
+            ignore_index=True,
+        )
+    )
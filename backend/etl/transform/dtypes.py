@@ -0,0 +1,103 @@
+"""Dtype policy of the processed datasets.
+
+Columns with a handful of distinct values (levels, sizes, categories, country
+and subdivision codes) become categoricals, ids and flags are downcast to the
+smallest integer type that holds them, and the remaining Python strings are
+interned, so equal values share one object. The policy is applied at the end
+of the cleaning step and again after datasets are concatenated, because
+categoricals with different categories concatenate to plain objects.
+"""
+
+import logging
+import sys
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Per dataset (and child table of etl.transform.save): columns by target dtype
+DTYPE_POLICY = {
+    "jobs": {
+        "category": ["level", "categories"],
+        "downcast": ["job_id", "company_id"],
+    },
+    "companies": {
+        "category": ["size"],
+        "downcast": ["company_id"],
+    },
+    "salaries": {
+        "category": ["company_name", "adz_category", "categories", "level"],
+        "downcast": ["adz_job_id", "company_id"],
+        "flag": ["salary_is_predicted"],
+    },
+    "locations": {
+        "category": ["location_city", "location_state", "location_country"],
+        "downcast": ["position"],
+    },
+    "industries": {
+        "category": ["industry_name"],
+        "downcast": ["position"],
+    },
+}
+
+
+def frame_memory_mb(df: pd.DataFrame) -> float:
+    """Deep memory usage of a DataFrame in MB."""
+    return df.memory_usage(deep=True).sum() / 1024**2
+
+
+def _intern_value(value, memo: dict):
+    if isinstance(value, str):
+        return sys.intern(value)
+    if isinstance(value, list):
+        # lists are shared between rows with the same locations, keep them shared
+        key = id(value)
+        if key not in memo:
+            memo[key] = [_intern_value(v, memo) for v in value]
+        return memo[key]
+    if isinstance(value, dict):
+        return {k: sys.intern(v) if isinstance(v, str) else v for k, v in value.items()}
+    return value
+
+
+def intern_strings(values: pd.Series) -> pd.Series:
+    """Intern the strings of an object column, including those in lists of dicts."""
+    memo = {}
+    return values.map(lambda v: _intern_value(v, memo))
+
+
+def compact_dtypes(df: pd.DataFrame, data_type: str) -> pd.DataFrame:
+    """
+    Apply the dtype policy of a dataset. Columns missing from the DataFrame are
+    skipped; object columns outside the policy get their strings interned.
+    Args:
+        df (pd.DataFrame): Cleaned DataFrame.
+        data_type (str): Key of DTYPE_POLICY ("jobs", "locations", ...).
+    Returns:
+        pd.DataFrame: DataFrame with compact dtypes.
+    """
+    policy = DTYPE_POLICY.get(data_type, {})
+    before = frame_memory_mb(df)
+    df = df.copy(deep=False)
+
+    for col in policy.get("downcast", []):
+        if col in df and pd.api.types.is_integer_dtype(df[col]):
+            df[col] = pd.to_numeric(df[col], downcast="integer")
+
+    for col in policy.get("flag", []):
+        if col in df:
+            flags = pd.to_numeric(df[col], errors="coerce")
+            df[col] = flags.astype("Int8" if flags.isna().any() else "int8")
+
+    for col in policy.get("category", []):
+        if col in df:
+            df[col] = df[col].astype("category")
+
+    for col in df.columns:
+        if df[col].dtype == object:
+            df[col] = intern_strings(df[col])
+
+    logger.info(
+        f"Dtype policy '{data_type}': {before:.2f} MB -> {frame_memory_mb(df):.2f} MB"
+    )
+    return df
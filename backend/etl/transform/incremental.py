@@ -0,0 +1,192 @@
+"""Incremental transform driven by a manifest of raw input files.
+
+For every dataset, a manifest under `data/processed/parts/<dataset>/` records
+the sha256 of each raw file in the raw directory and the processed part (a
+Parquet file) that was produced from it. A run only transforms raw files that are new or whose
+content changed; parts of unchanged files are reused, parts of files that
+left the raw directory (i.e. archived snapshots) are dropped. The processed
+dataset is the concatenation of all parts, deduplicated on the dataset id.
+
+Parts are only reused while the fingerprint of the transform is unchanged:
+PARTS_VERSION, the selected columns and the dtype policy of the dataset. A
+change to them rebuilds all parts. Changes to the cleaning or flattening logic
+are not detected, so they have to bump PARTS_VERSION.
+"""
+
+import hashlib
+import json
+import os
+from typing import Callable
+
+import pandas as pd
+from config.config import PROCESSED_DATA_DIR
+from etl.extract.raw_sink import list_raw_files
+from etl.transform.dtypes import DTYPE_POLICY, compact_dtypes
+
+PARTS_DIR = os.path.join(PROCESSED_DATA_DIR, "parts")
+MANIFEST_NAME = "manifest.json"
+
+# Bump when the flattening or cleaning logic changes, so all parts are rebuilt once
+PARTS_VERSION = 4
+
+
+def file_hash(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def transform_fingerprint(data_type: str, columns: dict) -> str:
+    """
+    Hash of the transform configuration a processed part depends on besides its
+    raw file, with PARTS_VERSION standing in for the code.
+    Args:
+        data_type (str): Dataset type ("jobs", "companies", "salaries").
+        columns (dict): Selected raw fields and their processed names.
+    Returns:
+        str: sha256 hex digest.
+    """
+    config = {
+        "version": PARTS_VERSION,
+        "columns": columns,
+        "dtypes": {
+            name: DTYPE_POLICY.get(name)
+            for name in (data_type, "locations", "industries")
+        },
+    }
+    encoded = json.dumps(config, sort_keys=True).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def nested_columns(df: pd.DataFrame) -> list:
+    """Object columns holding lists or dicts (i.e. locations, industries)."""
+    nested = []
+    for column in df.select_dtypes("object").columns:
+        values = df[column].dropna()
+        if len(values) and isinstance(values.iloc[0], (list, dict)):
+            nested.append(column)
+    return nested
+
+
+def write_part(df: pd.DataFrame, path: str) -> list:
+    """
+    Write a processed part as Parquet. Nested columns are stored as JSON text,
+    so their lists of dicts read back unchanged. Returns the JSON columns.
+    """
+    json_columns = nested_columns(df)
+    encoded = df.assign(
+        **{
+            column: df[column].map(
+                lambda value: (
+                    json.dumps(value) if isinstance(value, (list, dict)) else None
+                )
+            )
+            for column in json_columns
+        }
+    )
+    encoded.to_parquet(f"{path}.tmp", index=False)
+    os.replace(f"{path}.tmp", path)
+    return json_columns
+
+
+def read_part(path: str, json_columns: list) -> pd.DataFrame:
+    df = pd.read_parquet(path)
+    for column in json_columns:
+        df[column] = df[column].map(
+            lambda value: None if value is None else json.loads(value)
+        )
+    return df
+
+
+def load_manifest(path: str, fingerprint: str) -> dict:
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        if manifest.get("fingerprint") == fingerprint:
+            return manifest
+    return {"fingerprint": fingerprint, "files": {}}
+
+
+def save_manifest(manifest: dict, path: str):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def transform_incremental(
+    data_type: str,
+    files_dir: str,
+    transform_files: Callable,
+    id_column: str,
+    columns: dict,
+    parts_dir: str = PARTS_DIR,
+) -> pd.DataFrame:
+    """
+    Transform only new or changed raw files of a dataset and merge them with
+    the parts of the unchanged ones.
+    Args:
+        data_type (str): Dataset type ("jobs", "companies", "salaries").
+        files_dir (str): Directory containing raw snapshot files.
+        transform_files (callable): Called with a list of raw files, returns the
+            cleaned DataFrame (i.e. pipeline_transform.run_jobs with files=...).
+        id_column (str): Column to deduplicate the merged dataset on.
+        columns (dict): Selected raw fields and their processed names, part of
+            the fingerprint of the parts.
+    Returns:
+        pd.DataFrame: Processed dataset of all raw files in files_dir.
+    """
+    files = list_raw_files(files_dir)
+    if not files:
+        raise FileNotFoundError(f"No raw {data_type} files found in {files_dir}")
+
+    dataset_dir = os.path.join(parts_dir, data_type)
+    os.makedirs(dataset_dir, exist_ok=True)
+    manifest_path = os.path.join(dataset_dir, MANIFEST_NAME)
+    manifest = load_manifest(
+        manifest_path, transform_fingerprint(data_type, columns)
+    )
+    previous = manifest["files"]
+    current = {}
+
+    parts = []
+    for path in files:
+        name = os.path.basename(path)
+        digest = file_hash(path)
+        entry = previous.get(name)
+        part_path = os.path.join(dataset_dir, f"{digest[:16]}.parquet")
+
+        if entry and entry["hash"] == digest and os.path.exists(part_path):
+            json_columns = entry["json_columns"]
+            df = read_part(part_path, json_columns)
+            print(f"♻️ {data_type}: {name} unchanged ({len(df)} rows)")
+        else:
+            df = transform_files(files=[path])
+            json_columns = write_part(df, part_path)
+            print(f"🔄 {data_type}: {name} transformed ({len(df)} rows)")
+
+        current[name] = {
+            "hash": digest,
+            "part": os.path.basename(part_path),
+            "json_columns": json_columns,
+            "rows": len(df),
+        }
+        parts.append(df)
+
+    # parts of raw files that are gone (archived or deleted) or of an older fingerprint
+    used = {entry["part"] for entry in current.values()} | {MANIFEST_NAME}
+    for stale in set(os.listdir(dataset_dir)) - used:
+        os.remove(os.path.join(dataset_dir, stale))
+
+    manifest["files"] = current
+    save_manifest(manifest, manifest_path)
+
+    df = pd.concat(parts, ignore_index=True)
+    before = len(df)
+    df = df.drop_duplicates(subset=[id_column], keep="first").reset_index(drop=True)
+    # categories of the parts differ, so concat falls back to object columns
+    df = compact_dtypes(df, data_type)
+    print(f"✅ {data_type}: {len(df)} rows, {before - len(df)} duplicates across files")
+    return df
@@ -3,112 +3,194 @@ import os
 from config.config import (
     COMPANIES_CSV_FILE,
     JOBS_CSV_FILE,
+    PROCESSED_CSV_OUTPUT,
     PROCESSED_DATA_DIR,
     RAW_DATA_COMPANIES_DIR,
     RAW_DATA_JOBS_DIR,
     RAW_DATA_SALARIES_DIR,
     SALARIES_CSV_FILE,
+    TRANSFORM_BATCH_SIZE,
+    TRANSFORM_INCREMENTAL,
 )
+from etl.tracing import peak_rss_mb, span, trace_run
 from etl.transform import clean, save, transform
+from etl.transform.chunked import transform_chunked
 from etl.transform.clean import setup_logging
+from etl.transform.company_resolver import add_company_ids, load_company_index
+from etl.transform.dtypes import frame_memory_mb
+from etl.transform.incremental import transform_incremental
 
+# Selected raw fields (dotted paths) and their names in the processed data
+JOBS_COLUMNS = {
+    "id": "job_id",
+    "company.id": "company_id",
+    "name": "job_name",
+    "levels.name": "level",
+    "publication_date": "publication_date",
+    "locations": "locations",
+    "categories": "categories",
+}
+COMPANIES_COLUMNS = {
+    "id": "company_id",
+    "name": "company_name",
+    "description": "description",
+    "publication_date": "publication_date",
+    "size.name": "size",
+    "locations": "locations",
+    "industries": "industries",
+}
+SALARIES_COLUMNS = {
+    "id": "adz_job_id",
+    "company.display_name": "company_name",
+    "title": "adz_job_name",
+    "category.label": "adz_category",
+    "created": "publication_date",
+    "location.area": "locations",
+    "salary_min": "salary_min",
+    "salary_max": "salary_max",
+    "salary_is_predicted": "salary_is_predicted",
+}
 
-def run_jobs():
-    data_type = "jobs"
-    cols = [
-        "id",
-        "company.id",
-        "name",
-        "levels.name",
-        "publication_date",
-        "locations",
-        "categories",
-    ]
-    new_col_names = [
-        "job_id",
-        "company_id",
-        "job_name",
-        "level",
-        "publication_date",
-        "locations",
-        "categories",
-    ]
-    df = transform.flatten_json(RAW_DATA_JOBS_DIR, cols, new_col_names, data_type)
-    df = clean.data_cleaning(df, data_type)
+
+def run_source(data_type, columns, files_dir, files=None):
+    with span("flatten") as s:
+        df = transform.flatten_json(
+            files_dir, list(columns), list(columns.values()), data_type, files=files
+        )
+        s.rows_out = len(df)
+    with span("clean", rows_in=len(df)) as s:
+        df = clean.data_cleaning(df, data_type)
+        s.rows_out = len(df)
     return df
 
 
-def run_companies():
-    data_type = "companies"
-    cols = [
-        "id",
-        "name",
-        "description",
-        "publication_date",
-        "size.name",
-        "locations",
-        "industries",
-    ]
-    new_col_names = [
-        "company_id",
-        "company_name",
-        "description",
-        "publication_date",
-        "size",
-        "locations",
-        "industries",
-    ]
-    df = transform.flatten_json(RAW_DATA_COMPANIES_DIR, cols, new_col_names, data_type)
-    df = clean.data_cleaning(df, data_type)
-    return df
+def run_jobs(files_dir=RAW_DATA_JOBS_DIR, files=None):
+    return run_source("jobs", JOBS_COLUMNS, files_dir, files)
 
 
-def run_salaries():
-    data_type = "salaries"
-    cols = [
-        "id",
-        "company.display_name",
-        "title",
-        "category.label",
-        "created",
-        "location.area",
-        "salary_min",
-        "salary_max",
-        "salary_is_predicted",
-    ]
-    new_col_names = [
+def run_companies(files_dir=RAW_DATA_COMPANIES_DIR, files=None):
+    return run_source("companies", COMPANIES_COLUMNS, files_dir, files)
+
+
+def run_salaries(files_dir=RAW_DATA_SALARIES_DIR, files=None):
+    return run_source("salaries", SALARIES_COLUMNS, files_dir, files)
+
+
+# data_type: (run function, columns, raw folder, id column, nested columns, csv file)
+DATASETS = {
+    "jobs": (
+        run_jobs,
+        JOBS_COLUMNS,
+        RAW_DATA_JOBS_DIR,
+        "job_id",
+        ["locations"],
+        JOBS_CSV_FILE,
+    ),
+    "companies": (
+        run_companies,
+        COMPANIES_COLUMNS,
+        RAW_DATA_COMPANIES_DIR,
+        "company_id",
+        ["locations", "industries"],
+        COMPANIES_CSV_FILE,
+    ),
+    "salaries": (
+        run_salaries,
+        SALARIES_COLUMNS,
+        RAW_DATA_SALARIES_DIR,
         "adz_job_id",
-        "company_name",
-        "adz_job_name",
-        "adz_category",
-        "publication_date",
-        "locations",
-        "salary_min",
-        "salary_max",
-        "salary_is_predicted",
-    ]
-    df = transform.flatten_json(RAW_DATA_SALARIES_DIR, cols, new_col_names, data_type)
-    df = clean.data_cleaning(df, data_type)
+        ["locations"],
+        SALARIES_CSV_FILE,
+    ),
+}
+
+
+def run_dataset(data_type, run_func, columns, files_dir, id_column):
+    """
+    Transform a dataset, only re-running changed raw files if incremental, and
+    print its memory footprint and the peak RSS of the process so far.
+    """
+    if TRANSFORM_INCREMENTAL:
+        df = transform_incremental(
+            data_type, files_dir, run_func, id_column, columns
+        )
+    else:
+        df = run_func(files_dir)
+
+    peak = peak_rss_mb()
+    print(
+        f"📊 {data_type}: {len(df)} rows, {frame_memory_mb(df):.2f} MB in memory"
+        + (f", peak RSS {peak:.0f} MB" if peak is not None else "")
+    )
     return df
 
 
+def run_chunked(
+    data_type, columns, files_dir, id_column, nested_columns, csv_file, enrich=None
+):
+    """Transform a dataset in batches of TRANSFORM_BATCH_SIZE records (see chunked)."""
+    rows = transform_chunked(
+        data_type,
+        files_dir,
+        list(columns),
+        list(columns.values()),
+        id_column,
+        nested_columns,
+        TRANSFORM_BATCH_SIZE,
+        PROCESSED_DATA_DIR,
+        csv_file=csv_file if PROCESSED_CSV_OUTPUT else None,
+        enrich=enrich,
+    )
+    peak = peak_rss_mb()
+    if peak is not None:
+        print(f"📊 {data_type}: peak RSS {peak:.0f} MB")
+    return rows
+
+
+def resolve_companies(df):
+    """Add the Muse company_id of every salary (see company_resolver)."""
+    index = load_company_index(PROCESSED_DATA_DIR)
+    if index is None:
+        raise FileNotFoundError("Processed companies are needed to resolve salaries")
+    return add_company_ids(df, index)
+
+
 def main():
     logger = setup_logging()
     logger.info("Starting transform pipeline...")
     # create folderpaths for storage of processed data if not exists
     os.makedirs(PROCESSED_DATA_DIR, exist_ok=True)
 
-    # transform and save job data as csv
-    df_jobs = run_jobs()
-    save.save_as_csv(df_jobs, JOBS_CSV_FILE, PROCESSED_DATA_DIR)
+    with trace_run("transform"):
+        # transform and save jobs, companies and salaries (parquet, optionally csv);
+        # salaries are resolved against the companies saved before them
+        for data_type, dataset in DATASETS.items():
+            with span(f"transform.{data_type}") as s:
+                s.rows_out = transform_dataset(data_type, *dataset)
+
 
-    # transform and save company data as csv
-    df_companies = run_companies()
-    save.save_as_csv(df_companies, COMPANIES_CSV_FILE, PROCESSED_DATA_DIR)
+def transform_dataset(
+    data_type, run_func, columns, files_dir, id_column, nested_columns, csv_file
+):
+    """Transform and save one dataset. Returns the number of rows saved."""
+    enrich = resolve_companies if data_type == "salaries" else None
+    if TRANSFORM_BATCH_SIZE:
+        return run_chunked(
+            data_type, columns, files_dir, id_column, nested_columns, csv_file, enrich
+        )
 
-    # transform and save company data as csv
-    df_salaries = run_salaries()
-    save.save_as_csv(df_salaries, SALARIES_CSV_FILE, PROCESSED_DATA_DIR)
+    df = run_dataset(data_type, run_func, columns, files_dir, id_column)
+    if enrich:
+        with span("resolve_companies", rows_in=len(df)):
+            df = enrich(df)
+    with span("save.parquet", rows_in=len(df)):
+        save.save_as_parquet(
+            df, data_type, PROCESSED_DATA_DIR, id_column, nested_columns
+        )
+    if PROCESSED_CSV_OUTPUT:
+        with span("save.csv", rows_in=len(df)):
+            save.save_as_csv(df, csv_file, PROCESSED_DATA_DIR)
+    return len(df)
 
 
 if __name__ == "__main__":
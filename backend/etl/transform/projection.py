@@ -0,0 +1,181 @@
+"""Projected loading of raw snapshots.
+
+`load_projected` reads a raw snapshot record by record and keeps only the
+requested dotted paths (i.e. "company.id", "levels.name", "location.area"),
+so the memory and time of the transform scale with the selected fields and
+not with the full payload (like the HTML `contents` of every Muse job).
+
+Path semantics follow `pd.json_normalize` plus the former `add_level_name`:
+nested dicts are walked key by key, a missing key gives None, and a list met
+before the last key is replaced by its first element ("levels.name" is the
+name of the first level). Lists at the end of a path are kept as they are.
+
+orjson is used for parsing when it is installed, the json module otherwise.
+
+For loading in worker processes, `load_projected_arrow` returns the projected
+columns as an Arrow IPC buffer, which is cheaper to hand back to the parent
+than a pickled DataFrame; `arrow_to_frame` turns the concatenated tables into
+a DataFrame. Nested values (lists, dicts) and columns Arrow cannot type are
+carried as JSON strings and decoded again, so the result equals load_projected.
+"""
+
+import gzip
+import json
+from typing import List
+
+import pandas as pd
+import pyarrow as pa
+from etl.extract.raw_sink import RAW_SUFFIX
+
+try:
+    import orjson
+
+    loads = orjson.loads
+
+    def dumps(value):
+        return orjson.dumps(value).decode("utf-8")
+
+except ImportError:
+    orjson = None
+    loads = json.loads
+    dumps = json.dumps
+
+# Schema metadata key listing the JSON-encoded columns of an Arrow table
+JSON_COLUMNS_KEY = b"json_columns"
+
+
+def split_path(path: str) -> tuple:
+    return tuple(path.split("."))
+
+
+def extract_path(record, keys: tuple):
+    """Value at a split dotted path of a record, or None."""
+    value = record
+    for key in keys:
+        if isinstance(value, list):
+            value = value[0] if value else None
+        if not isinstance(value, dict):
+            return None
+        value = value.get(key)
+    return value
+
+
+def iter_records(path: str):
+    """Yield the records of a raw snapshot (NDJSON/gzip or legacy JSON array)."""
+    if str(path).endswith(RAW_SUFFIX):
+        with gzip.open(path, "rb") as f:
+            for line in f:
+                if line.strip():
+                    yield loads(line)
+    else:
+        with open(path, "rb") as f:
+            yield from loads(f.read())
+
+
+def load_projected(path: str, paths: List[str]) -> pd.DataFrame:
+    """
+    Load only the given dotted paths of a raw snapshot into a DataFrame with one
+    column per path (named like the path).
+    """
+    keys = [split_path(p) for p in paths]
+    columns = [[] for _ in paths]
+    for record in iter_records(path):
+        for column, k in zip(columns, keys):
+            column.append(extract_path(record, k))
+    return pd.DataFrame(dict(zip(paths, columns)), columns=paths)
+
+
+def iter_projected(files: List[str], paths: List[str], batch_size: int):
+    """
+    Like load_projected over several files, but yield DataFrames of at most
+    batch_size records (batches span file boundaries), so only one batch of
+    projected records is held in memory at a time.
+    """
+    keys = [split_path(p) for p in paths]
+    columns = [[] for _ in paths]
+    for path in files:
+        for record in iter_records(path):
+            for column, k in zip(columns, keys):
+                column.append(extract_path(record, k))
+            if len(columns[0]) >= batch_size:
+                yield pd.DataFrame(dict(zip(paths, columns)), columns=paths)
+                columns = [[] for _ in paths]
+    if columns[0]:
+        yield pd.DataFrame(dict(zip(paths, columns)), columns=paths)
+
+
+def _to_arrow_column(values: list):
+    """Arrow array of a column, or None if it has to be JSON-encoded."""
+    if any(isinstance(v, (list, dict)) for v in values):
+        return None
+    try:
+        return pa.array(values, from_pandas=True)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        return None
+
+
+def load_projected_arrow(path: str, paths: List[str]) -> pa.Buffer:
+    """Like load_projected, but returns the columns as an Arrow IPC stream buffer."""
+    keys = [split_path(p) for p in paths]
+    columns = [[] for _ in paths]
+    for record in iter_records(path):
+        for column, k in zip(columns, keys):
+            column.append(extract_path(record, k))
+
+    arrays, json_columns = [], []
+    for name, values in zip(paths, columns):
+        array = _to_arrow_column(values)
+        if array is None:
+            array = pa.array(
+                [None if v is None else dumps(v) for v in values], pa.string()
+            )
+            json_columns.append(name)
+        arrays.append(array)
+
+    table = pa.Table.from_arrays(
+        arrays,
+        names=paths,
+        metadata={JSON_COLUMNS_KEY: json.dumps(json_columns).encode("utf-8")},
+    )
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue()
+
+
+def read_arrow_buffer(buffer: pa.Buffer) -> pa.Table:
+    """Open an IPC buffer from load_projected_arrow without copying it."""
+    return pa.ipc.open_stream(buffer).read_all()
+
+
+def _json_columns(table: pa.Table) -> set:
+    metadata = table.schema.metadata or {}
+    return set(json.loads(metadata.get(JSON_COLUMNS_KEY, b"[]")))
+
+
+def _encode_json_columns(table: pa.Table, names: set) -> pa.Table:
+    for name in names:
+        values = table.column(name).to_pylist()
+        array = pa.array([None if v is None else dumps(v) for v in values], pa.string())
+        table = table.set_column(table.column_names.index(name), name, array)
+    return table.replace_schema_metadata(None)
+
+
+def arrow_to_frame(tables: List[pa.Table]) -> pd.DataFrame:
+    """
+    Concatenate tables of load_projected_arrow (zero-copy, chunks are only
+    referenced) and convert them to one DataFrame, decoding JSON columns.
+    """
+    names = tables[0].column_names
+    json_columns = set().union(*(_json_columns(t) for t in tables))
+    # a column can be typed in one file and JSON-encoded in another
+    tables = [_encode_json_columns(t, json_columns - _json_columns(t)) for t in tables]
+    table = pa.concat_tables(tables, promote_options="permissive")
+
+    df = table.drop_columns(list(json_columns)).to_pandas()
+    if df.empty and not len(df.columns):
+        df = pd.DataFrame(index=pd.RangeIndex(table.num_rows))
+    for name in json_columns:
+        values = table.column(name).to_pylist()
+        df[name] = [None if v is None else loads(v) for v in values]
+    return df[names]
@@ -1,6 +1,166 @@
 import os
+from typing import List
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from etl.transform.dtypes import compact_dtypes
+
+PARQUET_SUFFIX = ".parquet"
 
 
 def save_as_csv(df, filename, folder_path):
     file_path = os.path.join(folder_path, filename)
     df.to_csv(file_path, index=False)
+
+
+def parquet_path(name: str, folder_path: str) -> str:
+    """Path of a processed table, i.e. parquet_path("jobs_locations", folder)."""
+    return os.path.join(folder_path, f"{name}{PARQUET_SUFFIX}")
+
+
+def _list_entries(df: pd.DataFrame, id_column: str, column: str) -> pd.DataFrame:
+    """One row per entry of a list column: id_column, position, entry."""
+    values = df[column]
+    has_entries = values.map(lambda x: isinstance(x, list) and len(x) > 0)
+    entries = (
+        pd.DataFrame({id_column: df[id_column], "entry": values})[has_entries]
+        .explode("entry")
+        .reset_index(drop=True)
+    )
+    entries.insert(1, "position", entries.groupby(id_column).cumcount())
+    return entries
+
+
+def location_rows(df: pd.DataFrame, id_column: str, column: str) -> pd.DataFrame:
+    """
+    Child table of a cleaned locations column: id_column, position, location_city,
+    location_state, location_country (same fields the raw loaders used to parse from CSV).
+    """
+    entries = _list_entries(df, id_column, column)
+    locations = [loc if isinstance(loc, dict) else {} for loc in entries["entry"]]
+    entries["location_city"] = [loc.get("city") for loc in locations]
+    entries["location_state"] = [
+        loc.get("subdivision_code") or loc.get("state") for loc in locations
+    ]
+    entries["location_country"] = [
+        loc.get("country_code") or loc.get("country") for loc in locations
+    ]
+    return entries.drop(columns="entry")
+
+
+def industry_rows(df: pd.DataFrame, id_column: str, column: str) -> pd.DataFrame:
+    """Child table of an industries column: id_column, position, industry_name."""
+    entries = _list_entries(df, id_column, column)
+    entries["industry_name"] = [
+        ind.get("name") if isinstance(ind, dict) else None for ind in entries["entry"]
+    ]
+    return entries.drop(columns="entry")
+
+
+CHILD_TABLES = {"locations": location_rows, "industries": industry_rows}
+
+
+def _write_parquet(df: pd.DataFrame, path: str):
+    tmp_path = f"{path}.tmp"
+    df.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, path)
+
+
+def save_as_parquet(
+    df: pd.DataFrame,
+    name: str,
+    folder_path: str,
+    id_column: str,
+    nested_columns: List[str],
+):
+    """
+    Save a processed dataset as <name>.parquet. Nested list columns are not
+    stored as text but as child tables <name>_<column>.parquet with one row
+    per list entry, keyed by id_column, so loaders read them without parsing.
+    """
+    for column in nested_columns:
+        child = compact_dtypes(CHILD_TABLES[column](df, id_column, column), column)
+        _write_parquet(child, parquet_path(f"{name}_{column}", folder_path))
+    _write_parquet(df.drop(columns=nested_columns), parquet_path(name, folder_path))
+
+
+def _stable_type(data_type: pa.DataType) -> pa.DataType:
+    """
+    Arrow type that holds the values of every batch: the dtype policy picks
+    the integer width and the dictionary index width per batch, and a column
+    without any value in a batch has the null type.
+    """
+    if pa.types.is_integer(data_type):
+        return pa.int64()
+    if pa.types.is_dictionary(data_type):
+        return pa.dictionary(pa.int32(), _stable_type(data_type.value_type))
+    if pa.types.is_null(data_type):
+        return pa.large_string()
+    return data_type
+
+
+class ParquetAppender:
+    """
+    Append batches of a processed dataset to <name>.parquet and its child
+    tables (see save_as_parquet), one row group per batch. The files are
+    written under a temporary name and replace the previous output on close(),
+    so readers never see a partly written dataset.
+
+    Usage:
+        with ParquetAppender("jobs", folder, "job_id", ["locations"]) as output:
+            for batch in batches:
+                output.append(batch)
+    """
+
+    def __init__(
+        self, name: str, folder_path: str, id_column: str, nested_columns: List[str]
+    ):
+        self.name = name
+        self.folder_path = folder_path
+        self.id_column = id_column
+        self.nested_columns = nested_columns
+        self.rows = 0
+        self._writers = {}
+
+    def _write(self, table_name: str, df: pd.DataFrame):
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        writer = self._writers.get(table_name)
+        if writer is None:
+            schema = pa.schema(
+                [pa.field(f.name, _stable_type(f.type)) for f in table.schema],
+                metadata=table.schema.metadata,
+            )
+            path = parquet_path(table_name, self.folder_path)
+            writer = pq.ParquetWriter(f"{path}.tmp", schema)
+            self._writers[table_name] = writer
+        writer.write_table(table.cast(writer.schema))
+
+    def append(self, df: pd.DataFrame):
+        for column in self.nested_columns:
+            child = CHILD_TABLES[column](df, self.id_column, column)
+            self._write(f"{self.name}_{column}", compact_dtypes(child, column))
+        self._write(self.name, df.drop(columns=self.nested_columns))
+        self.rows += len(df)
+
+    def close(self):
+        for table_name, writer in self._writers.items():
+            writer.close()
+            path = parquet_path(table_name, self.folder_path)
+            os.replace(f"{path}.tmp", path)
+        self._writers = {}
+
+    def abort(self):
+        for table_name, writer in self._writers.items():
+            writer.close()
+            os.remove(f"{parquet_path(table_name, self.folder_path)}.tmp")
+        self._writers = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
@@ -1,52 +1,81 @@
-import glob
-import json
-import os
+from concurrent.futures import ProcessPoolExecutor
 from typing import List
 
 import pandas as pd
+from config.config import TRANSFORM_WORKERS
+from etl.extract.raw_sink import iter_raw_pages, list_raw_files
+from etl.transform.projection import (
+    arrow_to_frame,
+    load_projected,
+    load_projected_arrow,
+    read_arrow_buffer,
+)
 
 
 def load_json_to_df(file: str) -> pd.DataFrame:
-    """Load a JSON file into a normalized pandas DataFrame."""
-    with open(file, "r", encoding="utf-8") as f:
-        data = json.load(f)
-    df = pd.json_normalize(data)
-    return df
+    """
+    Load a raw snapshot (NDJSON/gzip or legacy JSON array) into a normalized pandas DataFrame.
+    NDJSON snapshots are read and normalized page by page.
+    """
+    dfs = [pd.json_normalize(page) for page in iter_raw_pages(file)]
+    if not dfs:
+        return pd.DataFrame()
+    return pd.concat(dfs, ignore_index=True)
 
 
-def add_level_name(df: pd.DataFrame) -> pd.DataFrame:
-    """Extract the first level name into a flat column."""
-    df["levels.name"] = df["levels"].apply(lambda x: x[0]["name"])
-    return df
+def load_files_parallel(
+    files: List[str], cols: List[str], workers: int
+) -> pd.DataFrame:
+    """
+    Parse files in a process pool. Every worker returns its projected columns
+    as an Arrow buffer; the tables are concatenated without copying and
+    converted to a single DataFrame at the end.
+    """
+    with ProcessPoolExecutor(max_workers=min(workers, len(files))) as executor:
+        buffers = executor.map(load_projected_arrow, files, [cols] * len(files))
+        tables = [read_arrow_buffer(buffer) for buffer in buffers]
+    return arrow_to_frame(tables)
 
 
 def flatten_json(
-    files_dir: str, cols: List[str], new_col_names: List[str], data_type: str
+    files_dir: str,
+    cols: List[str],
+    new_col_names: List[str],
+    data_type: str,
+    workers: int = None,
+    files: List[str] = None,
 ) -> pd.DataFrame:
     """
     Load and flatten multiple JSON files into a single DataFrame.
-    Extracts selected fields, optionally enriches job data and concatenates all records into one DataFrame.
+    Only the selected fields are materialized while parsing (see projection),
+    then all records are concatenated into one DataFrame.
 
     Args:
-        files_dir (str): Directory containing JSON files.
-        cols (list[str]): Input columns to extract.
+        files_dir (str): Directory containing raw snapshot files.
+        cols (list[str]): Dotted paths to extract (i.e. "company.id", "levels.name").
         new_col_names (list[str]): Output column names.
         data_type (str): Dataset type ("jobs", "companies", "salaries").
+        workers (int): Processes used to parse the files, defaults to
+            TRANSFORM_WORKERS. With more than one, files are loaded in parallel.
+        files (list[str]): Load these raw files instead of all files in files_dir.
     Returns:
         pd.DataFrame: Combined DataFrame from all JSON files.
     """
 
-    path = os.path.join(files_dir, "*")
-    files = glob.glob(path)
+    if files is None:
+        files = list_raw_files(files_dir)
+    workers = workers or TRANSFORM_WORKERS
+
+    if workers > 1 and len(files) > 1:
+        df_final = load_files_parallel(files, cols, workers)
+        df_final.columns = new_col_names
+        return df_final
 
     dfs = []
 
     for file in files:
-        df = load_json_to_df(file)
-        if data_type == "jobs":
-            df = add_level_name(df)
-        # Select and rename columns in the DataFrame
-        df = df[cols]
+        # Load only the selected columns and rename them
+        df = load_projected(file, cols)
         df.columns = new_col_names
         # add df to list of dataframes
         dfs.append(df)
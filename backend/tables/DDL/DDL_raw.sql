@@ -29,5 +29,11 @@ CREATE TABLE raw.salaries (
     locations TEXT,
     salary_min float,
     salary_max float,
-    salary_is_predicted int
-);
\ No newline at end of file
+    salary_is_predicted int,
+    company_id BIGINT
+);
+
+
+-- Migration of tables created before company_id existed
+-- (also run by etl/load/migrate_raw.py before every load)
+ALTER TABLE raw.salaries ADD COLUMN IF NOT EXISTS company_id BIGINT;
\ No newline at end of file
@@ -279,7 +279,7 @@ SELECT DISTINCT
     s.salary_max
 FROM raw.salaries s
 LEFT JOIN norm.companies c
-   ON LOWER(TRIM(c.name)) = LOWER(TRIM(s.company_name))
+   ON c.id = s.company_id
 CROSS JOIN LATERAL (
     SELECT 
         -- Werte direkt extrahieren (da Format bekannt)
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# the backend packages (config, etl, api) are imported from backend/
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,61 @@
+import json
+import os
+
+from etl.extract import archive
+from etl.extract.raw_sink import RawSink, read_raw_records
+
+RECORDS = [{"id": 1, "name": "a"}, {"name": "b", "id": 2}]
+
+
+def write_snapshots(folder):
+    """The same records as a legacy JSON array and as an NDJSON snapshot."""
+    folder.mkdir(parents=True, exist_ok=True)
+    legacy = folder / "muse_jobs_all_20251207_153606.json"
+    legacy.write_text(json.dumps(RECORDS, indent=4), encoding="utf-8")
+    with RawSink(str(folder / "muse_jobs_all.ndjson.gz")) as sink:
+        sink.write_page(RECORDS)
+    return str(legacy), sink.path
+
+
+def test_identical_content_is_stored_once(tmp_path):
+    legacy, ndjson = write_snapshots(tmp_path / "jobs")
+    blobs = str(tmp_path / "blobs")
+
+    legacy_hash, legacy_records = archive.store_blob(legacy, blobs)
+    ndjson_hash, ndjson_records = archive.store_blob(ndjson, blobs)
+
+    assert legacy_hash == ndjson_hash
+    assert legacy_records == ndjson_records == 2
+    assert read_raw_records(archive.blob_path(legacy_hash, blobs)) == RECORDS
+    assert [len(files) for _, _, files in os.walk(blobs) if files] == [1]
+
+
+def test_archive_snapshot_records_manifest_and_removes_file(tmp_path, monkeypatch):
+    blobs = str(tmp_path / "blobs")
+    store_blob = archive.store_blob
+    monkeypatch.setattr(archive, "store_blob", lambda path: store_blob(path, blobs))
+    legacy, ndjson = write_snapshots(tmp_path / "jobs")
+    conn = archive.connect(str(tmp_path / "manifest.sqlite"))
+
+    first = archive.archive_snapshot(legacy, "jobs", conn=conn)
+    second = archive.archive_snapshot(ndjson, "jobs", conn=conn)
+
+    assert not os.path.exists(legacy) and not os.path.exists(ndjson)
+    assert first["run_id"] == "20251207_153606"
+    assert first["created_at"] == "2025-12-07T15:36:06"
+    assert first["record_count"] == 2
+    assert first["blob_hash"] == second["blob_hash"]
+    assert archive.latest_snapshot("jobs", conn=conn) == second
+    assert archive.find_snapshot("jobs", "20251207_153606", conn=conn) == first
+    assert [r["run_id"] for r in archive.list_snapshots("jobs", conn=conn)] == [
+        first["run_id"],
+        second["run_id"],
+    ]
+    assert archive.list_snapshots("salaries", conn=conn) == []
+    conn.close()
+
+
+def test_parse_snapshot_name():
+    assert archive.parse_snapshot_name(
+        "/raw/salaries/adzuna_it_jobs_by_companies_20251030_144242.ndjson.gz"
+    ) == ("adzuna_it_jobs_by_companies", "20251030_144242", "2025-10-30T14:42:42")
@@ -0,0 +1,62 @@
+import logging
+
+import numpy as np
+import pandas as pd
+import pytest
+from etl.transform import clean, save
+from etl.transform.chunked import IdSet, transform_chunked
+from etl.transform.pipeline_transform import DATASETS
+from etl.transform.save import parquet_path
+
+
+def test_id_set_keeps_first_occurrence_across_batches():
+    seen = IdSet()
+
+    assert seen.add_new([5, 3, 5, 9]).tolist() == [True, True, False, True]
+    assert seen.add_new([9, 1, 1, 10, 3]).tolist() == [False, True, False, True, False]
+    assert seen.add_new(np.array([], dtype=np.int64)).tolist() == []
+    assert len(seen) == 5
+
+
+@pytest.fixture
+def cleaning_logger(monkeypatch):
+    # setup_logging writes to the log folder of the package, not needed here
+    monkeypatch.setattr(clean, "logger", logging.getLogger("test_chunked"))
+
+
+def read_table(name, folder):
+    df = pd.read_parquet(parquet_path(name, str(folder)))
+    # categories differ per batch, compare the values
+    return df.astype(
+        {c: object for c in df.columns if isinstance(df[c].dtype, pd.CategoricalDtype)}
+    )
+
+
+@pytest.mark.parametrize("data_type", ["jobs", "companies", "salaries"])
+def test_chunked_output_equals_full_output(data_type, tmp_path, cleaning_logger):
+    run_func, columns, files_dir, id_column, nested_columns, _ = DATASETS[data_type]
+    full = run_func(files_dir)
+    if full.empty:
+        pytest.skip(f"no recorded {data_type} snapshot")
+    save.save_as_parquet(full, data_type, str(tmp_path), id_column, nested_columns)
+
+    chunked_dir = tmp_path / "chunked"
+    chunked_dir.mkdir()
+    rows = transform_chunked(
+        data_type,
+        files_dir,
+        list(columns),
+        list(columns.values()),
+        id_column,
+        nested_columns,
+        batch_size=97,
+        folder_path=str(chunked_dir),
+    )
+
+    assert rows == len(full)
+    for name in [data_type] + [f"{data_type}_{c}" for c in nested_columns]:
+        expected = read_table(name, tmp_path)
+        actual = read_table(name, chunked_dir)
+        pd.testing.assert_frame_equal(
+            actual, expected, check_dtype=False, check_exact=False
+        )
@@ -0,0 +1,58 @@
+import pandas as pd
+import pytest
+from config.config import RAW_DATA_SALARIES_DIR
+from etl.extract.raw_sink import list_raw_files, read_raw_records
+from etl.transform.clean_helpers import (
+    CATEGORY_KEYWORDS,
+    classify_categories,
+    clean_string,
+    extract_category,
+)
+from rapidfuzz import fuzz
+
+
+def reference_category(title):
+    """The former per-title classification, one partial_ratio call per keyword."""
+    for cat, kws in CATEGORY_KEYWORDS.items():
+        if any(kw in title for kw in kws):
+            return cat
+
+    best_cat, best_score = None, 0
+    for cat, kws in CATEGORY_KEYWORDS.items():
+        for kw in kws:
+            score = fuzz.partial_ratio(title, kw)
+            if score > best_score:
+                best_cat, best_score = cat, score
+    return best_cat if best_score >= 80 else "Software Engineering"
+
+
+TITLES = [
+    "senior software engineer",
+    "data analyst",
+    "it support technician",
+    "softwre enginer",
+    "datta scientist",
+    "store manager",
+    "",
+    "data engineer developer",
+]
+
+
+@pytest.mark.parametrize("title", TITLES)
+def test_extract_category_matches_reference(title):
+    assert extract_category(title) == reference_category(title)
+
+
+def test_batch_matches_reference_on_recorded_titles():
+    files = list_raw_files(RAW_DATA_SALARIES_DIR)
+    if not files:
+        pytest.skip("no recorded salaries snapshot")
+    records = read_raw_records(files[0])
+    values = [clean_string(r["title"]) for r in records if r.get("title")] + TITLES
+    # duplicates and a shifted index, as in a filtered DataFrame
+    titles = pd.Series(values * 2, index=range(100, 100 + 2 * len(values)))
+
+    categories = classify_categories(titles)
+
+    assert categories.index.equals(titles.index)
+    assert categories.tolist() == [reference_category(t) for t in titles]
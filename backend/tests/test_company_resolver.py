@@ -0,0 +1,82 @@
+import pandas as pd
+from etl.transform.company_resolver import (
+    CompanyIndex,
+    add_company_ids,
+    load_backfill_company_index,
+    normalize_company_name,
+)
+from etl.transform.save import parquet_path
+
+COMPANIES = pd.DataFrame(
+    {
+        "company_id": [1, 2, 3, 4],
+        "company_name": ["Unum Group", "Cummins", "The Walt Disney Company", "Meta"],
+    }
+)
+
+
+def test_normalize_company_name():
+    assert normalize_company_name("Cummins Inc.") == "cummins"
+    assert normalize_company_name("APPLIED MATERIALS, INC.") == "applied materials"
+    # a name made of legal suffixes only is kept
+    assert normalize_company_name("The Company") == "the company"
+    assert normalize_company_name(None) is None
+    assert normalize_company_name("...") is None
+
+
+def test_resolve_exact_and_fuzzy_matches():
+    index = CompanyIndex(COMPANIES)
+
+    assert index.resolve("UNUM") == 1
+    assert index.resolve("Cummins Inc.") == 2
+    assert index.resolve("Walt Disney") == 3
+    # token_sort_ratio of "walt disneyy" and "walt disney" is above the threshold
+    assert index.resolve("Walt Disneyy Co") == 3
+
+
+def test_resolve_rejects_non_matches():
+    index = CompanyIndex(COMPANIES)
+
+    # same block, below the threshold
+    assert index.resolve("Meta Platforms") is None
+    assert index.resolve("Cummins Filtration Systems") is None
+    # no block
+    assert index.resolve("Disney") is None
+    assert index.resolve("Lyft") is None
+    assert index.resolve(None) is None
+
+
+def test_add_company_ids_inserts_nullable_column():
+    salaries = pd.DataFrame(
+        {
+            "adz_job_id": [10, 11, 12],
+            "company_name": pd.Categorical(["UNUM", "Lyft", None]),
+            "salary_min": [1.0, 2.0, 3.0],
+        }
+    )
+
+    df = add_company_ids(salaries, CompanyIndex(COMPANIES))
+
+    assert list(df.columns) == [
+        "adz_job_id",
+        "company_name",
+        "company_id",
+        "salary_min",
+    ]
+    assert str(df["company_id"].dtype) == "Int64"
+    assert df["company_id"].tolist() == [1, pd.NA, pd.NA]
+
+
+def test_backfill_index_prefers_newest_partition(tmp_path):
+    assert load_backfill_company_index(str(tmp_path)) is None
+    for partition, company_id in [
+        ("date=2025-10-30/muse_companies_all_20251030_091141", 1),
+        ("date=2025-12-07/muse_companies_all_20251207_152451", 7),
+    ]:
+        folder = tmp_path / "companies" / partition
+        folder.mkdir(parents=True)
+        pd.DataFrame({"company_id": [company_id], "company_name": ["Unum"]}).to_parquet(
+            parquet_path("companies", str(folder))
+        )
+
+    assert load_backfill_company_index(str(tmp_path)).resolve("Unum Group") == 7
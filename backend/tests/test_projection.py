@@ -0,0 +1,78 @@
+import pandas as pd
+from etl.extract.raw_sink import RawSink
+from etl.transform.projection import (
+    arrow_to_frame,
+    load_projected,
+    load_projected_arrow,
+    read_arrow_buffer,
+)
+
+PATHS = ["id", "company.id", "levels.name", "locations", "salary_min"]
+
+
+def values(series):
+    """Values of a column with every missing value (None, NaN) as None."""
+    return [None if not isinstance(v, list) and pd.isna(v) else v for v in series]
+
+
+def write_snapshot(tmp_path, name, records):
+    with RawSink(str(tmp_path / name)) as sink:
+        sink.write_page(records)
+    return sink.path
+
+
+def test_load_projected_follows_json_normalize_paths(tmp_path):
+    path = write_snapshot(
+        tmp_path,
+        "jobs.ndjson.gz",
+        [
+            {
+                "id": 1,
+                "company": {"id": 7, "name": "Acme"},
+                "levels": [{"name": "Senior Level"}, {"name": "Mid Level"}],
+                "locations": [{"name": "Boston, MA"}],
+                "contents": "<p>dropped</p>",
+            },
+            {"id": 2, "levels": []},
+        ],
+    )
+
+    df = load_projected(path, PATHS)
+
+    assert list(df.columns) == PATHS
+    assert df.loc[0, "company.id"] == 7
+    assert df.loc[0, "levels.name"] == "Senior Level"
+    assert df.loc[0, "locations"] == [{"name": "Boston, MA"}]
+    assert df.loc[1, ["company.id", "levels.name", "locations"]].isna().all()
+
+
+def test_arrow_buffers_round_trip_to_load_projected(tmp_path):
+    # salary_min is typed in one file and mixed (not typable) in the other
+    first = write_snapshot(
+        tmp_path,
+        "salaries_a.ndjson.gz",
+        [
+            {"id": 1, "locations": [{"city": "Austin"}], "salary_min": 100.5},
+            {"id": 2, "locations": None, "salary_min": None},
+        ],
+    )
+    second = write_snapshot(
+        tmp_path,
+        "salaries_b.ndjson.gz",
+        [
+            {"id": 3, "locations": [], "salary_min": "n/a"},
+            {"id": 4, "company": {"id": 9}, "salary_min": 80},
+        ],
+    )
+
+    buffers = [load_projected_arrow(path, PATHS) for path in (first, second)]
+    tables = [read_arrow_buffer(buffer) for buffer in buffers]
+    df = arrow_to_frame(tables)
+    expected = [load_projected(first, PATHS), load_projected(second, PATHS)]
+
+    assert list(df.columns) == PATHS
+    for path in PATHS:
+        assert values(df[path]) == values(expected[0][path]) + values(
+            expected[1][path]
+        )
+    assert values(df["salary_min"]) == [100.5, None, "n/a", 80]
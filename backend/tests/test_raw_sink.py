@@ -0,0 +1,65 @@
+import json
+import os
+
+import pytest
+from etl.extract.raw_sink import (
+    RawSink,
+    is_raw_file,
+    iter_raw_pages,
+    list_raw_files,
+    manifest_path_for,
+    read_raw_records,
+)
+
+
+def test_sink_writes_pages_and_manifest(tmp_path):
+    with RawSink(str(tmp_path / "muse_jobs_all.ndjson.gz")) as sink:
+        sink.write_page([{"id": 1}, {"id": 2}])
+        sink.write_page([])
+        sink.write_page([{"id": 3, "name": "Zürich"}])
+
+    assert os.path.basename(sink.path).startswith("muse_jobs_all_")
+    assert not os.path.exists(sink.part_path)
+    assert read_raw_records(sink.path) == [
+        {"id": 1},
+        {"id": 2},
+        {"id": 3, "name": "Zürich"},
+    ]
+
+    with open(manifest_path_for(sink.path), encoding="utf-8") as f:
+        manifest = json.load(f)
+    assert manifest["records"] == 3
+    assert manifest["pages"] == 2
+    assert manifest["bytes"] == os.path.getsize(sink.path)
+
+
+def test_sink_removes_part_file_on_error(tmp_path):
+    with pytest.raises(RuntimeError):
+        with RawSink(str(tmp_path / "salaries.ndjson.gz")) as sink:
+            sink.write_page([{"id": 1}])
+            raise RuntimeError("extraction failed")
+
+    assert not os.path.exists(sink.part_path)
+    assert list_raw_files(str(tmp_path)) == []
+
+
+def test_readers_page_ndjson_and_legacy_json(tmp_path):
+    records = [{"id": i} for i in range(5)]
+    legacy = tmp_path / "muse_jobs_all_20251208_172448.json"
+    legacy.write_text(json.dumps(records), encoding="utf-8")
+    with RawSink(str(tmp_path / "muse_jobs_all.ndjson.gz")) as sink:
+        sink.write_page(records[:3])
+        sink.write_page(records[3:])
+
+    for path in (str(legacy), sink.path):
+        assert [len(p) for p in iter_raw_pages(path, page_size=2)] == [2, 2, 1]
+        assert read_raw_records(path) == records
+
+
+def test_list_raw_files_skips_manifests_and_parts(tmp_path):
+    with RawSink(str(tmp_path / "jobs.ndjson.gz")) as sink:
+        sink.write_page([{"id": 1}])
+    (tmp_path / ".jobs_20250101_000000.ndjson.gz.part").write_bytes(b"")
+
+    assert list_raw_files(str(tmp_path)) == [sink.path]
+    assert not is_raw_file(manifest_path_for(sink.path))